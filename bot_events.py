@@ -3,15 +3,13 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import asyncio
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime, timezone, timedelta
 import uuid
-from util.core import CommandLogger, MessageLogger, DiscordHelper, NotBotOwnerError
+from util.core import CommandLogger, CommandStatsRollup, MessageLogger, DiscordHelper, NotBotOwnerError, DiscordLogShipper, LogPartitions, MaintenancePlanner
 from util.owner import BlacklistUtils, BlacklistQueries
-from util.moderation import MuteEventHelper
-from util.community import SyncNewMember
-from util.setup import WelcomeHandler
-from util.core.logger import _discord_log_buffer, _discord_log_lock
+from util.general import HelpFilter
+from util.setup import HighlightIndex, MemberJoinPipeline
 from util.core.database import UniqueUser
 
 logger = logging.getLogger(__name__)
@@ -25,6 +23,9 @@ _lock = asyncio.Lock()
 _command_log_cache = []
 _command_log_lock = asyncio.Lock()
 
+# --- Deferred Cog State ---
+_redispatched_messages = deque(maxlen=100)  # message ids already retried after loading deferred cogs
+
 # --- Background Tasks ---
 async def reset_counts_loop(bot):
     while True:
@@ -38,6 +39,7 @@ async def blacklist_cleanup_loop(bot):
         try:
             unblacklisted = await BlacklistUtils.cleanup_expired_blacklists(bot)
             for user_id, channel_id, guild_id in unblacklisted:
+                HelpFilter.invalidate(user_id)
                 target = (
                     f"user {user_id}" if user_id else
                     f"channel {channel_id}" if channel_id else
@@ -61,28 +63,69 @@ async def flush_command_logs_loop(bot):
             logger.error(f"Exception in flush_command_logs_loop: {e}", exc_info=True)
 
 async def flush_discord_log_buffer(bot):
+    shipper = DiscordLogShipper(bot)
     while True:
         await asyncio.sleep(60)
-        async with _discord_log_lock:
-            if not _discord_log_buffer:
-                continue
-            # Copy and clear the buffer
-            lines = list(_discord_log_buffer)
-            _discord_log_buffer.clear()
-        # Chunk lines so no message exceeds 1900 chars and no line is split
-        chunk = ""
-        channel_id = getattr(bot, "log_channel_cache", None)
-        if channel_id:
-            channel = bot.get_channel(channel_id)
-            if channel:
-                for line in lines:
-                    # +1 for newline
-                    if len(chunk) + len(line) + 1 > 1900:
-                        await channel.send(f"```{chunk}```")
-                        chunk = ""
-                    chunk += line + "\n"
-                if chunk:
-                    await channel.send(f"```{chunk}```")
+        try:
+            await shipper.flush()
+        except Exception as e:
+            logger.error(f"Failed to ship Discord log buffer: {e}")
+
+async def flush_message_log_digests(bot):
+    while True:
+        await asyncio.sleep(MessageLogger.DIGEST_WINDOW)
+        try:
+            await MessageLogger.flush_digests(bot)
+        except Exception as e:
+            logger.error(f"Failed to flush message log digests: {e}", exc_info=True)
+
+async def log_partition_rollover_loop(bot):
+    # Table maintenance stays off the startup path
+    await bot.wait_until_ready()
+    while True:
+        try:
+            result = await LogPartitions.rollover_all()
+            logger.info(result)
+        except Exception as e:
+            logger.error(f"Log partition rollover failed: {e}", exc_info=True)
+        await asyncio.sleep(6 * 60 * 60)
+
+async def maintenance_loop(bot):
+    """Check every 15 minutes for the quiet window; run table maintenance at most once a day."""
+    await bot.wait_until_ready()
+    last_run = None
+    while True:
+        await asyncio.sleep(15 * 60)
+        today = datetime.now().date()
+        if last_run == today:
+            continue
+        try:
+            result = await MaintenancePlanner.run()
+            if result:
+                last_run = today
+                logger.info(result)
+        except Exception as e:
+            logger.error(f"Database maintenance failed: {e}", exc_info=True)
+
+async def drain_telemetry(bot):
+    """Flush every telemetry buffer now, so a restart loses nothing. Returns summary lines."""
+    lines = []
+    count = len(_command_log_cache)
+    if count:
+        await CommandLogger.flush_command_logs(bot, _command_log_cache, _command_log_lock, logger)
+        lines.append(f"Flushed {count} command log entries")
+    await MessageLogger.flush_digests(bot)
+    await DiscordLogShipper(bot).flush()
+    lines.append("Flushed message log digests and the Discord log buffer")
+    return lines
+
+def export_state():
+    """In-memory event state worth carrying across a restart."""
+    return {"user_command_counts": {str(user_id): count for user_id, count in _user_command_counts.items()}}
+
+def import_state(data):
+    for user_id, count in data.get("user_command_counts", {}).items():
+        _user_command_counts[int(user_id)] += count
 
 # --- Command Event Handlers ---
 
@@ -163,6 +206,7 @@ async def on_command(ctx):
                                 )
                             )
                         await conn.commit()
+                    HelpFilter.invalidate(ctx.author.id)
                     logger.info(f"User {ctx.author.id} blacklisted for command spam.")
                     owner = (await ctx.bot.application_info()).owner
                     channel_id = str(ctx.channel.id)
@@ -231,17 +275,16 @@ async def on_command_completion(ctx):
                 found = True
                 break
     if not found:
+        # Already flushed: update the row and its hourly rollup together
         async with ctx.bot.db.acquire() as conn:
-            async with conn.cursor() as cursor:
-                await cursor.execute(
-                    '''
-                    UPDATE command_logs
-                    SET success=%s, error=%s, response_time=%s
-                    WHERE log_id=%s
-                    ''',
-                    (True, None, response_time, log_id)
-                )
-            await conn.commit()
+            await conn.begin()
+            try:
+                async with conn.cursor() as cursor:
+                    await CommandStatsRollup.apply_completion(cursor, log_id, response_time, success=True)
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
     await CommandLogger(ctx.bot).log_command_completion(ctx)
 
 @commands.Cog.listener()
@@ -249,13 +292,21 @@ async def on_command_error(ctx, error):
     error_messages = {
         commands.MissingPermissions: "❌ You don't have permission to use this command.",
         commands.MissingRequiredArgument: lambda e: f"❌ Missing required argument: `{e.param.name}`. Please check the command usage.",
-        commands.CommandNotFound: None,  # Silently ignore unknown commands
+        commands.CommandNotFound: None,  # Silently ignore unknown commands (after trying the deferred cogs)
         commands.BadArgument: "❌ Invalid argument provided. Please check your input.",
         commands.MemberNotFound: "❌ Member not found. Please provide a valid user ID or mention.",
         NotBotOwnerError: "❌ You do not have permission to use this command. (Bot owner only)",
         commands.CommandOnCooldown: "⏳ This command is on cooldown. Please try again later.",
     }
 
+    # The command may live in a deferred cog that hasn't loaded yet; load it and retry the message once
+    if (isinstance(error, commands.CommandNotFound)
+            and ctx.message.id not in _redispatched_messages
+            and await ctx.bot.load_deferred_cogs()):
+        _redispatched_messages.append(ctx.message.id)
+        await ctx.bot.process_commands(ctx.message)
+        return
+
     for exc_type, message in error_messages.items():
         if isinstance(error, exc_type):
             if message is None:
@@ -359,9 +410,7 @@ async def on_member_remove(member: discord.Member):
 @commands.Cog.listener()
 async def on_member_join(member: discord.Member):
     try:
-        await MuteEventHelper.handle_mute_reapplication(member.guild._state._get_bot(), member)
-        await WelcomeHandler.send_welcome_message(member.guild._state._get_bot(), member)
-        await SyncNewMember.sync_community_loadouts(member)
+        member.guild._state._get_bot().join_pipeline.submit(member)
     except Exception as e:
         logger.error(f"Error in on_member_join for user {member.id}: {e}", exc_info=True)
 
@@ -369,6 +418,9 @@ async def on_member_join(member: discord.Member):
 
 @commands.Cog.listener()
 async def on_message(message: discord.Message):
+    # Indexed before the bot check: the history build includes bot posts too
+    if message.guild and message.attachments:
+        HighlightIndex.add_message(message)
     if message.author.bot:
         return
 
@@ -376,14 +428,42 @@ async def on_message(message: discord.Message):
 async def on_message_delete(message):
     await MessageLogger.log_deleted_message(message)
 
+@commands.Cog.listener()
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    # Raw, because clips indexed from channel history are not in the message cache
+    if payload.guild_id:
+        HighlightIndex.remove_message(payload.guild_id, payload.message_id)
+
+@commands.Cog.listener()
+async def on_raw_bulk_message_delete(payload: discord.RawBulkMessageDeleteEvent):
+    if payload.guild_id:
+        for message_id in payload.message_ids:
+            HighlightIndex.remove_message(payload.guild_id, message_id)
+
 @commands.Cog.listener()
 async def on_message_edit(before, after):
     await MessageLogger.log_edited_message(before, after)
 
+# --- Channel Event Handlers ---
+
+@commands.Cog.listener()
+async def on_guild_channel_create(channel):
+    MessageLogger.invalidate_log_channel(channel.guild.id)
+
+@commands.Cog.listener()
+async def on_guild_channel_delete(channel):
+    MessageLogger.invalidate_log_channel(channel.guild.id)
+
+@commands.Cog.listener()
+async def on_guild_channel_update(before, after):
+    if before.name != after.name or getattr(before, "category_id", None) != getattr(after, "category_id", None):
+        MessageLogger.invalidate_log_channel(after.guild.id)
+
 # --- Registration helper ---
 
 def setup_event_handlers(bot):
     """Register event listeners and log registration"""
+    bot.join_pipeline = MemberJoinPipeline(bot)
     listeners = [
         ("on_command", on_command),
         ("on_command_completion", on_command_completion),
@@ -394,7 +474,12 @@ def setup_event_handlers(bot):
         ("on_member_join", on_member_join),
         ("on_message", on_message),
         ("on_message_delete", on_message_delete),
-        ("on_message_edit", on_message_edit)
+        ("on_raw_message_delete", on_raw_message_delete),
+        ("on_raw_bulk_message_delete", on_raw_bulk_message_delete),
+        ("on_message_edit", on_message_edit),
+        ("on_guild_channel_create", on_guild_channel_create),
+        ("on_guild_channel_delete", on_guild_channel_delete),
+        ("on_guild_channel_update", on_guild_channel_update)
     ]
     
     registered_events = []
@@ -414,7 +499,10 @@ def start_background_tasks(bot):
         ("reset_counts_loop", reset_counts_loop),
         ("blacklist_cleanup_loop", blacklist_cleanup_loop),
         ("flush_command_logs_loop", flush_command_logs_loop),
-        ("flush_discord_log_buffer", flush_discord_log_buffer)
+        ("flush_discord_log_buffer", flush_discord_log_buffer),
+        ("flush_message_log_digests", flush_message_log_digests),
+        ("log_partition_rollover_loop", log_partition_rollover_loop),
+        ("maintenance_loop", maintenance_loop)
     ]
     
     started_tasks = []
@@ -5,12 +5,12 @@ import time
 from dotenv import load_dotenv
 import discord
 from discord.ext import commands
-from util.core import Startup, DMZcordLogger, Database, Filters, DiscordLogHandler
+from util.core import Startup, StartupPhases, ImportProfiler, DMZcordLogger, Filters, DiscordLogHandler, GuildSettings, CommandTreeSync, BotConfig, StateHandoff
 import logging
 import asyncio
-from util.voice import MusicCacheManager
+from util.voice import MusicCacheManager, MusicMetadataCache
 import aiomysql
-from bot_events import setup_event_handlers, start_background_tasks
+from bot_events import setup_event_handlers, start_background_tasks, drain_telemetry, export_state, import_state
 
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO)  # Force INFO logs to console
@@ -38,7 +38,10 @@ class MyBot(commands.Bot):
         self.startup_log_lines = []
         self.cog_load_results = []
         self._vacuum_done = False
-        self._synced_commands = 0
+        self._command_sync_lines = []
+        self.deferred_cogs = []
+        self._deferred_cogs_attempted = set()  # loaded or failed; never retried
+        self._deferred_cogs_lock = asyncio.Lock()
         self._startup_complete = False
         self._guild_lines = []
         self._presence_str = ""     
@@ -51,67 +54,43 @@ class MyBot(commands.Bot):
         self.startup_log_lines.append("\n" + "="*40 + f"\nStarting bot process (PID: {os.getpid()})...")
         self.startup_log_lines.append("🤖 MyBot initialized.")
         self.startup_log_lines.append("⚙️ Starting setup_hook...")
+        phases = StartupPhases()
 
-        music_result = MusicCacheManager.clear_music_cache()
-        self.startup_log_lines.append(str(music_result))
-
-        vacuum_result = await Database.vacuum_report()
-        self.startup_log_lines.append(str(vacuum_result))
-
-        def find_cogs(base_dir="cogs"):
-            cogs = []
-            for root, dirs, files in os.walk(base_dir):
-                if "WIP" in root.split(os.sep):
-                    continue
-                for file in files:
-                    if file.endswith("Cog.py"):
-                        rel_path = os.path.relpath(os.path.join(root, file), base_dir)
-                        module = rel_path.replace(os.sep, ".")[:-3]
-                        cogs.append(f"cogs.{module}")
-            return cogs
-        cog_files = find_cogs()
-        for cog in cog_files:
-            start = time.perf_counter()
-            try:
-                await self.load_extension(cog)
-                elapsed = time.perf_counter() - start
-                self.cog_load_results.append(f"  [OK]   {cog} ({elapsed:.2f}s)")
-            except Exception as e:
-                elapsed = time.perf_counter() - start
-                self.cog_load_results.append(
-                    f"  [FAIL] {cog} ({elapsed:.2f}s) ({e})")
-        self.startup_log_lines.append(
-            "="*40 + "\nLoaded Cogs:\n" +
-            "\n".join(self.cog_load_results) + "\n" + "="*40
-        )
-
-        # Sync global slash commands
-        try:
-            synced = await self.tree.sync()
-            self._synced_commands = len(synced)
-        except Exception as e:
-            logger.error("Failed to sync commands: %s", e, exc_info=True)
-
-        self.db = await aiomysql.create_pool(
+        # The pool comes first so every later phase can use it
+        self.db = await phases.run("db_pool", aiomysql.create_pool(
             host=os.getenv("DB_HOST"),
             user=os.getenv("DB_USER"),
             password=os.getenv("DB_PASSWORD"),
             db=os.getenv("DB_NAME"),
             autocommit=True
+        ))
+
+        # Cogs listed in DEFERRED_COGS load after on_ready (or on first use) instead of here
+        config = BotConfig.from_env()
+        cogs = Startup.find_cogs()
+        self.deferred_cogs = [cog for cog in cogs if cog in config.deferred_cogs]
+        profiler = ImportProfiler()
+
+        # Independent phases run together; maintenance is deferred to background tasks after on_ready
+        results = await phases.run_concurrently({
+            "settings": self.load_settings(),
+            "music_cache": asyncio.to_thread(MusicCacheManager.load_index),
+            "music_metadata": asyncio.to_thread(MusicMetadataCache.load),
+            "cogs": self.load_cogs([cog for cog in cogs if cog not in self.deferred_cogs], profiler),
+        })
+        for name in ("music_cache", "music_metadata"):
+            if results[name]:
+                self.startup_log_lines.append(str(results[name]))
+        self.startup_log_lines.append(
+            "="*40 + "\nLoaded Cogs:\n" +
+            "\n".join(self.cog_load_results) + "\n" + "="*40
         )
+        self.startup_log_lines.append(profiler.summary())
+        if self.deferred_cogs:
+            self.startup_log_lines.append("Deferred Cogs:\n" + "\n".join(f"  {cog}" for cog in self.deferred_cogs))
 
-        # Load and cache logging level from DB
-        await Startup.load_logging_settings(self)
-        # Fetch log_channel_id from the logging settings table
-        log_channel_id = None
-        async with self.db.acquire() as conn:
-            async with conn.cursor() as cursor:
-                await cursor.execute("SELECT log_channel FROM logging WHERE `key` = 'logging_level' LIMIT 1")
-                row = await cursor.fetchone()
-                if row and row[0]:
-                    log_channel_id = row[0]
-        if log_channel_id:
-            self.log_channel_cache = int(log_channel_id)
+        # Deferred cogs are left out of the synced tree; they load on demand
+        self._command_sync_lines = await phases.run("command_sync", self.sync_commands())
 
         # Attach DiscordLogHandler if log_channel_cache is set
         if getattr(self, "log_channel_cache", None):
@@ -126,6 +105,71 @@ class MyBot(commands.Bot):
         start_background_tasks(self)
 
         self.add_check(Startup.global_blacklist_check)
+        self.startup_log_lines.append(phases.summary())
+
+    async def load_settings(self):
+        # Load and cache logging level and log channel from DB
+        await Startup.load_logging_settings(self)
+
+        # Load every guild's settings in one query
+        settings_count = await GuildSettings.load_all()
+        self.startup_log_lines.append(f"Loaded {settings_count} guild setting(s)")
+
+    async def load_cogs(self, cogs, profiler=None):
+        async def load(cog):
+            start = time.perf_counter()
+            try:
+                await self.load_extension(cog)
+                return f"  [OK]   {cog} ({time.perf_counter() - start:.2f}s)"
+            except Exception as e:
+                return f"  [FAIL] {cog} ({time.perf_counter() - start:.2f}s) ({e})"
+
+        with profiler or ImportProfiler():
+            self.cog_load_results = list(await asyncio.gather(*(load(cog) for cog in cogs)))
+
+    async def load_deferred_cogs(self):
+        """
+        Load deferred cogs not yet attempted, on the first unknown prefix command.
+        Each cog is attempted once; a failed import is not retried. Returns True
+        only if at least one extension actually loaded.
+        """
+        async with self._deferred_cogs_lock:
+            pending = [cog for cog in self.deferred_cogs
+                       if cog not in self.extensions and cog not in self._deferred_cogs_attempted]
+            if not pending:
+                return False
+            self._deferred_cogs_attempted.update(pending)
+            profiler = ImportProfiler()
+            await self.load_cogs(pending, profiler)
+            logger.info("Loaded deferred cogs:\n" + "\n".join(self.cog_load_results) + "\n" + profiler.summary(5))
+            return any(cog in self.extensions for cog in pending)
+
+    async def sync_commands(self):
+        # Sync slash commands (globally, or to DEV_GUILD_IDS), skipped when the command tree is unchanged
+        try:
+            return await CommandTreeSync.sync(self, BotConfig.from_env().dev_guild_ids)
+        except Exception as e:
+            logger.error("Failed to sync commands: %s", e, exc_info=True)
+            return []
+
+    async def prepare_restart(self):
+        """Drain telemetry, persist caches and write the state handoff for the next process. Returns summary lines."""
+        lines = await drain_telemetry(self)
+        await asyncio.to_thread(MusicCacheManager.save_index)
+        await MusicMetadataCache.flush()
+        snapshots = StateHandoff.snapshot_cogs(self)
+        StateHandoff.save({"events": export_state(), "cogs": snapshots})
+        lines.append(f"Handed off state for: {', '.join(snapshots) or 'nothing'}")
+        return lines
+
+    async def restore_handoff(self):
+        """Restore what prepare_restart() saved, if this process was started by a restart."""
+        handoff = StateHandoff.load()
+        if not handoff:
+            return
+        import_state(handoff.get("events", {}))
+        lines = await StateHandoff.restore_cogs(self, handoff.get("cogs", {}))
+        self.startup_log_lines.append("Restored State:\n" + "\n".join(lines or ["  nothing to restore"]))
 
     async def on_ready(self):
 
@@ -139,12 +183,18 @@ class MyBot(commands.Bot):
         self.startup_log_lines.append(self._bot_ready_name)
         
         # Synced commands
-        self.startup_log_lines.append(f"Synced {self._synced_commands} global command(s)")
+        self.startup_log_lines.extend(self._command_sync_lines)
 
         # Connected guilds
         guild_lines = [f"  {guild.name} ({guild.id})" for guild in self.guilds]
         self._connected_guilds = guild_lines
         self.startup_log_lines.append("="*40 + "\nConnected Guilds:\n" + "\n".join(guild_lines) + "\n" + "="*40)
+
+        # Rejoin voice and requeue music, restore spam counters etc. from a graceful restart
+        try:
+            await self.restore_handoff()
+        except Exception as e:
+            logger.error("Failed to restore restart handoff: %s", e, exc_info=True)
         startup_message = "\n".join(self.startup_log_lines)
         logger.info(startup_message)
 
@@ -6,6 +6,7 @@ from discord.ext import tasks
 from util.core import Database, CommandLogger
 from util.moderation import MuteUtils
 from util.owner import BlacklistUtils
+from util.general import HelpFilter
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +65,8 @@ class BlacklistCleanupTasks:
         while True:
             await asyncio.sleep(60)
             try:
-                await BlacklistUtils.cleanup_expired_blacklists(self.bot)
+                for user_id, _, _ in await BlacklistUtils.cleanup_expired_blacklists(self.bot):
+                    HelpFilter.invalidate(user_id)
             except Exception as e:
                 logger.error(f"Failed to clean up expired blacklists: {e}", exc_info=True)
 
@@ -3,6 +3,7 @@ from discord.ext import commands
 from discord import app_commands
 from typing import Union
 import logging
+from util.core import GuildSettings
 from util.moderation import WelcomeSettingsView, WelcomeHelper, StatusHelper
 
 logger = logging.getLogger(__name__)
@@ -52,14 +53,9 @@ class WelcomeCog(commands.Cog):
 
         # If no arguments are provided, show interactive settings view
         if not any([welcome_channel_id, squad_channel_id, highlights_channel_id, log_channel_id]):
-            # Fetch current settings from database
-            async with self.bot.db.acquire() as conn:
-                async with conn.cursor() as cur:
-                    await cur.execute(
-                        "SELECT `key`, value FROM guild_settings WHERE guild_id = %s AND `key` IN ('welcome_channel_id', 'squad_channel_id', 'highlights_channel_id', 'log_channel_id')",
-                        (guild_id,)
-                    )
-                    rows = await cur.fetchall()
+            # Fetch current settings from the settings cache
+            current = await GuildSettings.get_settings(guild_id, keys=[key for key, _ in settings])
+            rows = list(current.items())
 
             # Create interactive view
             view = WelcomeSettingsView(ctx, self.bot, guild_id, rows)
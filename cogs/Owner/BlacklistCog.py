@@ -1,5 +1,6 @@
 from discord.ext import commands
 from util.owner import BlacklistQueries, BlacklistUtils
+from util.general import HelpFilter
 from datetime import datetime
 import logging
 
@@ -155,6 +156,7 @@ class BlacklistCog(commands.Cog):
             duration_seconds=duration,  # None means permanent
             active=True
         )
+        HelpFilter.invalidate(user_id)
         # Logging
         target = (
             f"user {user_id}" if user_id else
@@ -201,6 +203,7 @@ class BlacklistCog(commands.Cog):
             guild_id=guild_id,
             active=False
         )
+        HelpFilter.invalidate(user_id)
         # Logging
         target = (
             f"user {user_id}" if user_id else
@@ -2,7 +2,7 @@ import logging
 import json
 import time
 from discord.ext import commands
-from util.core import Database
+from util.core import Database, CommandTreeSync, BotConfig, StateHandoff
 
 RESTART_STATUS_FILE = "restart_status.json"
 
@@ -15,18 +15,42 @@ class Owner(commands.Cog):
     @commands.hybrid_command(name="restart", description="Restart the bot)")
     @commands.is_owner()
     async def restart(self, ctx):
-        msg = await ctx.send("Restarting...")
+        msg = await ctx.send("Draining and restarting...")
+        # Flush telemetry and hand music queues etc. to the next process before going down
+        try:
+            lines = await self.bot.prepare_restart()
+            logger.info("Restart drain:\n" + "\n".join(lines))
+        except Exception as e:
+            logger.error(f"Restart drain failed, restarting anyway: {e}", exc_info=True)
         with open(RESTART_STATUS_FILE, "w") as f:
             json.dump({"channel_id": msg.channel.id, "message_id": msg.id, "timestamp": time.time()}, f)
         self.bot._do_restart = True  # Set a flag
         await self.bot.close()
 
+    @commands.command(name="hotreload", description="Reload a cog in-process, keeping its live state")
+    @commands.is_owner()
+    async def hotreload(self, ctx, extension: str):
+        start = time.perf_counter()
+        try:
+            handed_off = await StateHandoff.hot_reload(self.bot, extension)
+        except Exception as e:
+            await ctx.send(f"❌ Failed to reload `{extension}`:\n```{e}```")
+            return
+        kept = f", kept state of {', '.join(handed_off)}" if handed_off else ""
+        await ctx.send(f"✅ Reloaded `{extension}` in {(time.perf_counter() - start) * 1000:.2f}ms{kept}.")
+
     @commands.hybrid_command(name="shutdown", description="Shutdown the bot")
     @commands.is_owner()
     async def shutdown(self, ctx):
         msg = await ctx.send("✅ Shutdown complete!")
         await self.bot.close()
 
+    @commands.command(name="synctree", description="Force a slash command sync")
+    @commands.is_owner()
+    async def synctree(self, ctx):
+        lines = await CommandTreeSync.sync(self.bot, BotConfig.from_env().dev_guild_ids, force=True)
+        await ctx.send("\n".join(lines))
+
     @commands.command(name="vacuum", description="Run the database vacuum")
     @commands.is_owner()
     async def vacuum(self, ctx):
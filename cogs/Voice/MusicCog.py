@@ -1,21 +1,174 @@
+import time
 import discord
-from discord.ext import commands
-import asyncio
+from datetime import datetime
+from discord.ext import commands, tasks
+import logging
+from util.core.handoff import StateHandoff
 from util.voice.download import MusicDownloader
+from util.voice.formatter import Formatter
+from util.voice.metadata import MusicMetadataCache
 from util.voice.playback import MusicPlayback
 from util.voice.validation import MusicValidation
-from util.voice.state import GuildMusicState
+from util.voice.state import GuildMusicState, Track
+from util.voice.worker import MusicQueueWorker
+
+logger = logging.getLogger(__name__)
 
 class MusicCog(commands.Cog):
+    IDLE_TIMEOUT = 5 * 60  # nothing playing or queued
+    EMPTY_CHANNEL_TIMEOUT = 2 * 60  # no listeners left in the voice channel
+
     def __init__(self, bot):
         self.bot = bot
         self.guild_states = {}  # guild_id: GuildMusicState
+        self._tasks = set()  # background tasks, held until done so none is garbage-collected mid-run
+
+    async def cog_load(self):
+        # Queues, workers and voice connections carry over from the previous instance on a hot reload
+        self.guild_states = StateHandoff.claim(self.bot, self.qualified_name, self.guild_states)
+        self.reap_idle_states.start()
+
+    async def cog_unload(self):
+        self.reap_idle_states.cancel()
+        # Only a hot reload hands state on; a plain unload (or shutdown) stops workers and leaves voice
+        if StateHandoff.is_reloading(self.bot):
+            if self.guild_states:
+                StateHandoff.stash(self.bot, self.qualified_name, self.guild_states)
+            return
+        for guild_id in list(self.guild_states):
+            await self.release_state(guild_id)
+
+    def snapshot_state(self):
+        """Voice channel and queue per connected guild, for a restart; the current track resumes where it was."""
+        guilds = {}
+        for guild_id, state in self.guild_states.items():
+            vc = state.voice_client
+            if not vc or not vc.is_connected():
+                continue
+            tracks = [self._snapshot_track(track) for track in state.queue]
+            if state.current:
+                elapsed = (datetime.now() - state.now_playing_start).total_seconds() if state.now_playing_start else 0
+                tracks.insert(0, self._snapshot_track(state.current, state.current.start_offset + elapsed))
+            if tracks:
+                guilds[str(guild_id)] = {
+                    "voice_channel_id": vc.channel.id,
+                    "text_channel_id": state.text_channel.id if state.text_channel else None,
+                    "tracks": tracks,
+                }
+        return guilds
+
+    @staticmethod
+    def _snapshot_track(track, start_offset=0):
+        return {
+            "url": track.url,
+            "queued_by": track.queued_by,
+            "requester_id": track.requester.id if track.requester else None,
+            "start_offset": start_offset,
+        }
+
+    async def restore_state(self, guilds):
+        """
+        Rejoin and requeue what snapshot_state() saved. Each track gets its requester
+        back so the worker still runs the duration check; tracks whose requester is
+        no longer in the guild are dropped.
+        """
+        restored = 0
+        for guild_id, data in guilds.items():
+            guild = self.bot.get_guild(int(guild_id))
+            channel = guild.get_channel(data["voice_channel_id"]) if guild else None
+            if not channel:
+                continue
+            tracks = []
+            for track in data["tracks"]:
+                requester = guild.get_member(track["requester_id"]) if track.get("requester_id") else None
+                if requester:
+                    tracks.append(Track(track["url"], track["queued_by"], requester=requester,
+                                        start_offset=track.get("start_offset", 0)))
+            dropped = len(data["tracks"]) - len(tracks)
+            if dropped:
+                logger.info(f"Dropped {dropped} restored track(s) in guild {guild_id}: requester not found")
+            if not tracks:
+                continue
+            state = self.get_guild_state(guild.id)
+            try:
+                state.voice_client = await channel.connect()
+            except Exception as e:
+                logger.warning(f"Failed to rejoin voice in guild {guild_id} after restart: {e}")
+                await self.release_state(guild.id)
+                continue
+            if data.get("text_channel_id"):
+                state.text_channel = guild.get_channel(data["text_channel_id"])
+            state.enqueue_many(tracks)
+            state.worker.schedule_prefetch()
+            state.worker.start()
+            restored += 1
+        return f"{restored} music queue(s)"
+
+    def _spawn(self, coro):
+        """Start a background task, holding a reference until it finishes and logging it if it fails."""
+        task = self.bot.loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Music background task failed: {task.exception()}", exc_info=task.exception())
 
     def get_guild_state(self, guild_id):
         if guild_id not in self.guild_states:
-            self.guild_states[guild_id] = GuildMusicState()
+            state = GuildMusicState(guild_id)
+            state.worker = MusicQueueWorker(self.bot, state)
+            self.guild_states[guild_id] = state
         return self.guild_states[guild_id]
 
+    async def release_state(self, guild_id):
+        """Stop a guild's worker, disconnect and drop its state; cached files are unpinned as playback ends."""
+        state = self.guild_states.pop(guild_id, None)
+        if not state:
+            return
+        state.worker.stop()
+        if state.voice_client and state.voice_client.is_connected():
+            try:
+                await state.voice_client.disconnect()
+            except Exception as e:
+                logger.warning(f"Failed to disconnect idle voice client in guild {guild_id}: {e}")
+        state.voice_client = None
+
+    @tasks.loop(minutes=1)
+    async def reap_idle_states(self):
+        """Disconnect from silent or empty channels and forget guilds with no music activity."""
+        now = time.monotonic()
+        for guild_id, state in list(self.guild_states.items()):
+            vc = state.voice_client
+            reason = None
+            if not vc or not vc.is_connected():
+                if state.is_idle() and now - state.last_active >= self.IDLE_TIMEOUT:
+                    reason = "no voice connection"
+            else:
+                listeners = [m for m in vc.channel.members if not m.bot]
+                if listeners:
+                    state.empty_since = None
+                elif state.empty_since is None:
+                    state.empty_since = now
+                if state.empty_since is not None and now - state.empty_since >= self.EMPTY_CHANNEL_TIMEOUT:
+                    reason = "empty channel"
+                elif state.is_idle() and not vc.is_playing() and now - state.last_active >= self.IDLE_TIMEOUT:
+                    reason = "idle"
+            if reason:
+                logger.info(f"Releasing music state for guild {guild_id} ({reason})")
+                await self.release_state(guild_id)
+
+    @reap_idle_states.before_loop
+    async def before_reap_idle_states(self):
+        await self.bot.wait_until_ready()
+
+    async def _connect(self, ctx, state):
+        vc = await ctx.author.voice.channel.connect()
+        state.voice_client = vc
+        return vc
+
     @commands.hybrid_command(name="join", description="Join your current voice channel.")
     async def join(self, ctx):
         try:
@@ -34,12 +187,11 @@ class MusicCog(commands.Cog):
             await ctx.send("I'm already connected to a voice channel.")
             return
 
-        vc = await ctx.author.voice.channel.connect()
-        state.voice_client = vc
+        await self._connect(ctx, state)
         await ctx.send("Joined!")
 
-    @commands.hybrid_command(name="play", description="Play a YouTube link in your voice channel.")
-    async def play(self, ctx, url: str):
+    @commands.hybrid_command(name="play", description="Play YouTube links or a playlist in your voice channel.")
+    async def play(self, ctx, *, urls: str):
         try:
             await ctx.message.delete()
         except Exception:
@@ -51,64 +203,83 @@ class MusicCog(commands.Cog):
             await ctx.send("You must be in a voice channel to use this command.")
             return
 
-        state = self.get_guild_state(ctx.guild.id)
-        if not state.voice_client or not state.voice_client.is_connected():
-            await ctx.invoke(self.join)
-            state = self.get_guild_state(ctx.guild.id)
-        vc = state.voice_client
-
-        if not MusicValidation.is_youtube_url(url):
+        url_list = urls.split()
+        invalid = [url for url in url_list if not MusicValidation.is_youtube_url(url)]
+        if not url_list or invalid:
             await ctx.send("That does not look like a valid YouTube link. Please provide a valid YouTube URL.")
             return
 
-        # Download and queue
-        await ctx.send("Downloading and processing...")
-        outtmpl = f"temp/{ctx.guild.id}_%(id)s.%(ext)s"
-        try:
-            info, filename = await MusicDownloader.download_youtube(url, outtmpl)
-        except Exception as e:
-            await ctx.send(f"Error downloading: {e}")
-            return
-        info['queued_by'] = str(ctx.author)
-        state.queue.append((info, filename))
-        await ctx.send(f"Queued: {info.get('title', 'Unknown Title')}")
+        # Known tracks are checked up front; others are checked by the worker once resolved
+        if len(url_list) == 1:
+            cached = MusicMetadataCache.get(url_list[0])
+            if cached:
+                allowed, message = MusicValidation.check_duration_permissions(ctx.author, cached["duration"])
+                if not allowed:
+                    await ctx.send(message)
+                    return
 
-        # If nothing is playing, start playback
-        if not vc.is_playing() and not vc.is_paused():
-            await self._play_next(ctx, state)
+        state = self.get_guild_state(ctx.guild.id)
 
-    async def _play_next(self, ctx, state):
-        if not state.queue:
-            await ctx.send("Queue is empty.")
+        # Playlists are flat-extracted in one call each; audio is only resolved when a track nears the front
+        track_urls = []
+        for url in url_list:
+            if MusicValidation.is_playlist_url(url):
+                try:
+                    entries = await MusicDownloader.resolve_playlist(url, guild_id=ctx.guild.id)
+                except Exception as e:
+                    await ctx.send(f"Error reading playlist {url}: {e}")
+                    continue
+                track_urls.extend(MusicMetadataCache.add_flat_entries(entries))
+            else:
+                track_urls.append(url)
+        if not track_urls:
             return
-        info, filename = state.queue.pop(0)
-        state.now_playing = info
-        vc = state.voice_client
-        def after_playing(error):
-            fut = self._play_next(ctx, state)
-            asyncio.run_coroutine_threadsafe(fut, self.bot.loop)
-        vc.play(discord.FFmpegPCMAudio(source=filename), after=after_playing)
-        await ctx.send(f"Now playing: {info.get('title', 'Unknown Title')} (queued by {info.get('queued_by', 'Unknown')})")
+
+        if not state.voice_client or not state.voice_client.is_connected():
+            await self._connect(ctx, state)
+        state.text_channel = ctx.channel
+
+        # Queue immediately; the worker resolves and prefetches in the background
+        first_position = len(state.queue) + state.queue_offset
+        state.enqueue_many([Track(url, str(ctx.author), requester=ctx.author) for url in track_urls])
+        state.worker.schedule_prefetch()
+        state.worker.start()
+
+        if len(track_urls) == 1:
+            await ctx.send(f"Queued at position {first_position}.")
+        else:
+            # Titles and durations for the rest of the batch fill in concurrently
+            self._spawn(MusicMetadataCache.warm(track_urls, guild_id=ctx.guild.id))
+            await ctx.send(f"Queued {len(track_urls)} tracks at positions {first_position}-{first_position + len(track_urls) - 1}.")
 
     @commands.hybrid_command(name="queue", description="Show the current music queue.")
     async def queue(self, ctx):
+        state = self.get_guild_state(ctx.guild.id)
+        if not state.queue and not state.now_playing:
+            await ctx.send("The queue is empty.")
+            return
+        await ctx.send("\n".join(Formatter.format_queue(state.now_playing, state.now_playing_start, state.queue)))
+
+    @commands.hybrid_command(name="remove", description="Remove a song from the queue.")
+    async def remove(self, ctx, number: int):
         state = self.get_guild_state(ctx.guild.id)
         if not state.queue:
             await ctx.send("The queue is empty.")
             return
-        msg = "\n".join([
-            f"{i+1}. {info.get('title', 'Unknown Title')} (queued by {info.get('queued_by', 'Unknown')})"
-            for i, (info, _) in enumerate(state.queue)
-        ])
-        await ctx.send(msg)
+        # Numbers are as shown by /queue, where the playing track is 1
+        first, last = state.queue_offset, state.queue_offset + len(state.queue) - 1
+        if number < first or number > last:
+            await ctx.send(f"Please specify a valid queued song number between {first} and {last}.")
+            return
+        track = state.remove(number - first)
+        state.worker.schedule_prefetch()
+        await ctx.send(f"Removed: {track.title}")
 
     @commands.hybrid_command(name="stop", description="Stop music and disconnect from the voice channel.")
     async def stop(self, ctx):
-        state = self.get_guild_state(ctx.guild.id)
-        if state.voice_client and state.voice_client.is_connected():
-            await state.voice_client.disconnect()
-            state.voice_client = None
-            state.queue.clear()
+        state = self.guild_states.get(ctx.guild.id)
+        if state and state.voice_client and state.voice_client.is_connected():
+            await self.release_state(ctx.guild.id)
             await ctx.send("Disconnected and cleared the queue.")
         else:
             await ctx.send("I'm not in a voice channel.")
@@ -140,8 +311,7 @@ class MusicCog(commands.Cog):
             return
 
         # Register the vote
-        guild_id = ctx.guild.id
-        votes_set = self.state.get_skip_votes(guild_id)
+        votes_set = self.get_guild_state(ctx.guild.id).skip_votes
         votes_set.add(ctx.author.id)
 
         members = [m for m in vc.channel.members if not m.bot]
@@ -169,18 +339,22 @@ class MusicCog(commands.Cog):
             await ctx.send("Only moderators or the server owner can use this command.")
             return
 
-        queue = self.state.get_queue(ctx.guild.id)
+        state = self.get_guild_state(ctx.guild.id)
+        queue = state.queue
         if not queue:
             await ctx.send("The queue is empty.")
             return
 
-        if number is None or number < 2 or number > len(queue):
-            await ctx.send(f"Please specify a valid song number between 2 and {len(queue)}.")
+        # Numbers are as shown by /queue, where the playing track is 1
+        first, last = state.queue_offset, state.queue_offset + len(queue) - 1
+        if number is None or number < first or number > last:
+            await ctx.send(f"Please specify a valid queued song number between {first} and {last}.")
             return
 
-        index = number - 1
+        index = number - first
         song = queue.pop(index)
         queue.insert(0, song)
+        state.worker.schedule_prefetch()
 
         vc = ctx.voice_client
         if vc and vc.is_playing():
@@ -190,28 +364,5 @@ class MusicCog(commands.Cog):
     async def play_error(self, ctx, error):
         await MusicPlayback.play_error(ctx, error)
 
-    @commands.hybrid_command(name="join", description="Join your current voice channel.")
-    async def join(self, ctx):
-        try:
-            await ctx.message.delete()
-        except Exception:
-            pass
-        if ctx.interaction:
-            await ctx.interaction.response.defer()
-
-        # Check if user is in a voice channel
-        if not ctx.author.voice or not ctx.author.voice.channel:
-            await ctx.send("You are not in a voice channel.")
-            return
-
-        # Check if bot is already connected to a voice channel in this guild
-        if ctx.voice_client and ctx.voice_client.is_connected():
-            await ctx.send("I'm already connected to a voice channel.")
-            return
-
-        # Connect to the user's voice channel
-        await ctx.author.voice.channel.connect()
-        await ctx.send("Joined!")
-
 async def setup(bot):
-    await bot.add_cog(MusicCog(bot))
\ No newline at end of file
+    await bot.add_cog(MusicCog(bot))
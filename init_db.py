@@ -1,5 +1,6 @@
+import sys
 import asyncio
-from util.core import DatabaseConnection
+from util.core import DatabaseConnection, CommandStatsRollup, LogPartitions
 async def get_current_db_name():
     conn = await DatabaseConnection.get_db_connection()
     try:
@@ -104,6 +105,64 @@ async def create_tables():
                     timestamp VARCHAR(50) NOT NULL
                 )
             ''')
+            # Reversed log_id so short-ID (suffix) lookups become indexed prefix scans
+            await add_column_if_not_exists(cursor, 'command_logs', 'log_id_reversed',
+                                           'VARCHAR(32) AS (REVERSE(log_id)) STORED')
+
+            # Command stats rollup, maintained at command log flush time (see CommandStatsRollup)
+            await cursor.execute('''
+                CREATE TABLE IF NOT EXISTS command_stats_hourly (
+                    hour DATETIME NOT NULL,
+                    command_name VARCHAR(100) NOT NULL,
+                    count INT NOT NULL DEFAULT 0,
+                    success_count INT NOT NULL DEFAULT 0,
+                    timed_count INT NOT NULL DEFAULT 0,
+                    sum_time DOUBLE NOT NULL DEFAULT 0,
+                    min_time FLOAT,
+                    max_time FLOAT,
+                    PRIMARY KEY (hour, command_name)
+                )
+            ''')
+            await cursor.execute('''
+                CREATE TABLE IF NOT EXISTS command_stats_buckets (
+                    hour DATETIME NOT NULL,
+                    command_name VARCHAR(100) NOT NULL,
+                    bucket SMALLINT NOT NULL,
+                    count INT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (hour, command_name, bucket)
+                )
+            ''')
+            await cursor.execute('''
+                CREATE TABLE IF NOT EXISTS command_user_stats (
+                    user_id VARCHAR(100) PRIMARY KEY,
+                    count INT NOT NULL DEFAULT 0,
+                    timed_count INT NOT NULL DEFAULT 0,
+                    sum_time DOUBLE NOT NULL DEFAULT 0,
+                    max_time FLOAT
+                )
+            ''')
+            # Existing logs predate the rollup; seed it once
+            await cursor.execute("SELECT COUNT(1) FROM command_stats_hourly")
+            if (await cursor.fetchone())[0] == 0:
+                await CommandStatsRollup.backfill(cursor)
+
+            # Maintenance Log (before/after stats for every OPTIMIZE the planner runs)
+            await cursor.execute('''
+                CREATE TABLE IF NOT EXISTS maintenance_log (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    table_name VARCHAR(100) NOT NULL,
+                    started_at VARCHAR(50) NOT NULL,
+                    finished_at VARCHAR(50),
+                    table_rows BIGINT,
+                    data_length_before BIGINT,
+                    index_length_before BIGINT,
+                    data_free_before BIGINT,
+                    data_length_after BIGINT,
+                    index_length_after BIGINT,
+                    data_free_after BIGINT,
+                    result VARCHAR(255)
+                )
+            ''')
 
             # Community Loadouts
             await cursor.execute('''
@@ -215,6 +274,10 @@ async def create_tables():
                 )
             ''')
 
+            # Partition the append-only log tables by day so retention can drop whole partitions
+            for table in LogPartitions.TABLES:
+                await LogPartitions.partition_table(cursor, table)
+
             # Create indexes for all tables (only the requested ones)
             if await create_index_if_not_exists(cursor, 'idx_moderation_user_id_active', 'moderation', 'user_id, active'):
                 created_indexes.append('idx_moderation_user_id_active')
@@ -238,6 +301,8 @@ async def create_tables():
                 created_indexes.append('idx_command_logs_user_id')
             if await create_index_if_not_exists(cursor, 'idx_command_logs_command_name', 'command_logs', 'command_name'):
                 created_indexes.append('idx_command_logs_command_name')
+            if await create_index_if_not_exists(cursor, 'idx_command_logs_log_id_reversed', 'command_logs', 'log_id_reversed'):
+                created_indexes.append('idx_command_logs_log_id_reversed')
 
         await conn.commit()
     finally:
@@ -267,6 +332,27 @@ async def create_index_if_not_exists(cursor, index_name, table_name, columns):
         return True
     return False
 
+async def add_column_if_not_exists(cursor, table_name, column_name, definition):
+    """
+    Add a column to an existing table if it is missing.
+    Returns True if added, False if it already exists.
+    """
+    await cursor.execute('''
+        SELECT COUNT(1)
+        FROM information_schema.columns
+        WHERE table_schema = DATABASE()
+        AND table_name = %s
+        AND column_name = %s
+    ''', (table_name, column_name))
+    column_exists = await cursor.fetchone()
+
+    if column_exists and column_exists[0] == 0:
+        await cursor.execute(f'''
+            ALTER TABLE {table_name} ADD COLUMN `{column_name}` {definition}
+        ''')
+        return True
+    return False
+
 async def clear_all_tables():
     """
     Drops all tables in the current database and prints their names.
@@ -291,15 +377,16 @@ async def clear_all_tables():
     finally:
         conn.close()
 
-async def main():
+async def main(migrate_only=False):
     print("=" * 50)
     print("🔗 Connecting to database...")
     db_name = await get_current_db_name()
     print(f"📂 Current database: {db_name}")
     print("=" * 50)
 
-    # Clear all tables before initializing
-    await clear_all_tables()
+    # Clear all tables before initializing; --migrate keeps existing data and only adds what is missing
+    if not migrate_only:
+        await clear_all_tables()
 
     before_tables = await get_existing_tables()
     print("📋 Tables before initialization:")
@@ -346,4 +433,4 @@ async def main():
     conn.close()  # <-- Optionally close the connection
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(migrate_only="--migrate" in sys.argv))
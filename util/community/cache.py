@@ -1,5 +1,4 @@
 from datetime import datetime, timezone
-from playwright.async_api import async_playwright
 from util.community.constants import MW2GunsLower
 import json
 import discord
@@ -15,6 +14,8 @@ class CommunityLoadoutCacher:
     async def cache_community_loadouts(self, username, guild_ids, save_loadouts, msg=None):
         url = f"https://wzhub.gg/loadouts/community/{username}"
         now = datetime.now(timezone.utc)
+        # playwright is heavy and only needed here; import it on first use
+        from playwright.async_api import async_playwright
         try:
             async with async_playwright() as p:
                 browser = await p.chromium.launch(headless=True)
@@ -7,28 +7,36 @@ class SyncNewMember:
     @staticmethod
     async def sync_community_loadouts(member):
         """Sync community loadouts for the new member."""
-        query_loadouts = '''
-            SELECT username, data, last_updated FROM community_loadouts
-            WHERE username IN (SELECT wzhub_username FROM user_sync WHERE discord_id = %s)
-        '''
-        rows = await Database.fetch(query_loadouts, str(member.id))
-
-        if rows:
-            for row in rows:
-                username = row["username"]
-                data = row["data"]
-                last_updated = row["last_updated"]
-                query_check = 'SELECT 1 FROM community_loadouts WHERE username = %s AND guild_id = %s'
-                exists = await Database.fetchrow(query_check, username, str(member.guild.id))
-
-                if not exists:
-                    query_insert = '''
-                        INSERT INTO community_loadouts (username, data, last_updated, guild_id)
-                        VALUES (%s, %s, %s, %s)
-                    '''
-                    await Database.execute(query_insert, username, data, last_updated, str(member.guild.id))
-        else:
+        copied = await SyncNewMember.sync_community_loadouts_pairs([(member.id, member.guild.id)])
+        if not copied:
             logger.info(
-                "[on_member_join] No cached loadouts or sync'd username for user %s (%s)", member, member.id)
+                "[on_member_join] No new cached loadouts or sync'd username for user %s (%s)", member, member.id)
 
+    @staticmethod
+    async def sync_community_loadouts_bulk(guild, members):
+        """Copy cached loadouts into the guild for a batch of new members in one statement."""
+        return await SyncNewMember.sync_community_loadouts_pairs(
+            [(member.id, guild.id) for member in members])
 
+    @staticmethod
+    async def sync_community_loadouts_pairs(pairs):
+        """
+        Copy every cached loadout of each synced discord_id into its paired guild_id.
+        One INSERT IGNORE ... SELECT for all pairs; rows already present in the
+        target guild are skipped by the (username, guild_id) primary key.
+        Returns the number of rows inserted.
+        """
+        pairs = list({(str(discord_id), str(guild_id)) for discord_id, guild_id in pairs})
+        if not pairs:
+            return 0
+        targets = " UNION ALL ".join(
+            ["SELECT %s AS discord_id, %s AS guild_id"] * len(pairs))
+        query = f'''
+            INSERT IGNORE INTO community_loadouts (username, data, last_updated, guild_id)
+            SELECT cl.username, cl.data, cl.last_updated, t.guild_id
+            FROM ({targets}) t
+            JOIN user_sync us ON us.discord_id = t.discord_id
+            JOIN community_loadouts cl ON cl.username = us.wzhub_username
+        '''
+        params = [value for pair in pairs for value in pair]
+        return await Database.execute(query, *params)
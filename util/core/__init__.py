@@ -1,14 +1,22 @@
+from .commandsync import *
 from .config import *
 from .constants import *
 from .database import *
 from .exceptions import *
 from .filters import *
+from .handoff import *
 from .logger import *
+from .maintenance import *
 from .pagination import *
+from .partitions import *
+from .rollup import *
+from .settings import *
 from .startup import *
 from .utils import *
 
 __all__ = [
+    # commandsync.py
+    "CommandTreeSync",
     # config.py
     "BotConfig",
     # constants.py
@@ -23,12 +31,22 @@ __all__ = [
     "CommandCooldownError", "NotBotOwnerError",
     # filters.py
     "Filters",
+    # handoff.py
+    "StateHandoff",
     # logger.py
-    "CommandLogger",
+    "CommandLogger", "DiscordLogShipper",
+    # maintenance.py
+    "MaintenancePlanner",
     # pagination.py
     "TablePaginator", "ButtonPaginator",
+    # partitions.py
+    "LogPartitions",
+    # rollup.py
+    "CommandStatsRollup",
+    # settings.py
+    "GuildSettings",
     # startup.py
-    "Startup", "DiscordLogHandler", "DMZcordLogger", "LoggingThreshold", "MessageLogger",
+    "Startup", "StartupPhases", "ImportProfiler", "DiscordLogHandler", "DMZcordLogger", "LoggingThreshold", "MessageLogger",
     # utils.py
     "TimeUtils", "TableUtils", "StringUtils", "MockContext", "DiscordHelper", "SizeUtils"
 ]
\ No newline at end of file
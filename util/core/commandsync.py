@@ -0,0 +1,88 @@
+import json
+import hashlib
+import logging
+import discord
+from .database import Database
+from .settings import GuildSettings
+
+logger = logging.getLogger(__name__)
+
+class CommandTreeSync:
+    """
+    Sync app commands only when the serialized command tree has changed since the last sync.
+    The global fingerprint lives in the logging table; per-guild fingerprints for dev
+    guilds live in guild_settings.
+    """
+    FINGERPRINT_KEY = "command_tree_hash"
+
+    @staticmethod
+    def fingerprint(tree, guild=None):
+        """Stable SHA-256 of the commands Discord would receive for the given scope."""
+        payload = sorted(
+            (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+            key=lambda c: (c.get("type", 1), c["name"])
+        )
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    async def get_stored_fingerprint(key):
+        row = await Database.fetchrow("SELECT value FROM logging WHERE `key` = %s", key)
+        return row["value"] if row else None
+
+    @staticmethod
+    async def store_fingerprint(key, value):
+        await Database.execute(
+            "INSERT INTO logging (`key`, value) VALUES (%s, %s) AS new ON DUPLICATE KEY UPDATE value = new.value",
+            key, value
+        )
+
+    @classmethod
+    async def sync_global(cls, bot, force=False):
+        """
+        Sync global commands if their fingerprint changed.
+        Returns the number of commands synced, or None if the sync was skipped.
+        """
+        fingerprint = cls.fingerprint(bot.tree)
+        if not force and await cls.get_stored_fingerprint(cls.FINGERPRINT_KEY) == fingerprint:
+            return None
+        synced = await bot.tree.sync()
+        await cls.store_fingerprint(cls.FINGERPRINT_KEY, fingerprint)
+        return len(synced)
+
+    @classmethod
+    async def sync_guild(cls, bot, guild_id, force=False):
+        """
+        Copy the global commands into a guild and sync that guild if its fingerprint changed.
+        Guild syncs show up immediately, which is what dev guilds want.
+        Returns the number of commands synced, or None if the sync was skipped.
+        """
+        guild = discord.Object(id=guild_id)
+        bot.tree.copy_global_to(guild=guild)
+        fingerprint = cls.fingerprint(bot.tree, guild=guild)
+        if not force and await GuildSettings.get_setting(cls.FINGERPRINT_KEY, guild_id) == fingerprint:
+            return None
+        synced = await bot.tree.sync(guild=guild)
+        await GuildSettings.set_setting(cls.FINGERPRINT_KEY, fingerprint, guild_id)
+        return len(synced)
+
+    @classmethod
+    async def sync(cls, bot, dev_guild_ids=None, force=False):
+        """
+        Sync globally, or only the dev guilds when any are configured (a dev instance
+        shouldn't push its work-in-progress commands to every server).
+        Returns one summary line per sync target.
+        """
+        if not dev_guild_ids:
+            synced = await cls.sync_global(bot, force=force)
+            return ["Command tree unchanged, skipped global sync" if synced is None
+                    else f"Synced {synced} global command(s)"]
+        lines = []
+        for guild_id in dev_guild_ids:
+            try:
+                synced = await cls.sync_guild(bot, guild_id, force=force)
+                lines.append(f"Command tree unchanged for dev guild {guild_id}, skipped sync" if synced is None
+                             else f"Synced {synced} command(s) to dev guild {guild_id}")
+            except Exception as e:
+                logger.error(f"Failed to sync commands to guild {guild_id}: {e}", exc_info=True)
+                lines.append(f"Failed to sync commands to dev guild {guild_id}: {e}")
+        return lines
@@ -1,17 +1,24 @@
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 @dataclass
 class BotConfig:
     token: str
     guild_id: Optional[int] = None
     log_channel_id: Optional[int] = None
+    # Comma-separated DEV_GUILD_IDS; when set, commands sync to these guilds only
+    dev_guild_ids: List[int] = field(default_factory=list)
+    # Comma-separated DEFERRED_COGS (e.g. cogs.Owner.DebugCog); loaded the first time a prefix command
+    # is not found. Their slash commands are not synced, so list prefix-command cogs here
+    deferred_cogs: List[str] = field(default_factory=list)
     
     @classmethod
     def from_env(cls):
         return cls(
             token=os.getenv('BOT_TOKEN'),
             guild_id=int(os.getenv('GUILD_ID')) if os.getenv('GUILD_ID') else None,
-            log_channel_id=int(os.getenv('LOG_CHANNEL_ID')) if os.getenv('LOG_CHANNEL_ID') else None
+            log_channel_id=int(os.getenv('LOG_CHANNEL_ID')) if os.getenv('LOG_CHANNEL_ID') else None,
+            dev_guild_ids=[int(g) for g in os.getenv('DEV_GUILD_IDS', '').split(',') if g.strip()],
+            deferred_cogs=[c.strip() for c in os.getenv('DEFERRED_COGS', '').split(',') if c.strip()]
         )
\ No newline at end of file
@@ -91,13 +91,14 @@ class DatabaseConnection:
 class Database:
     @staticmethod
     async def execute(query, *args):
-        """Execute a query that modifies the database (INSERT, UPDATE, DELETE)."""
+        """Execute a query that modifies the database (INSERT, UPDATE, DELETE). Returns the affected row count."""
         conn = await DatabaseConnection.get_db_connection()
         try:
             async with conn.cursor() as real_cursor:
                 cursor = LoggingCursor(real_cursor)
-                await cursor.execute(query, args)
+                affected = await cursor.execute(query, args)
                 await conn.commit()
+                return affected
         finally:
             conn.close()
 
@@ -128,48 +129,14 @@ class Database:
     @staticmethod
     async def vacuum_report():
         """
-        Optimizes all tables in the MySQL database using OPTIMIZE TABLE.
-        Returns a string with the size before and after optimization.
+        Optimize the tables that need it right now, ignoring the low-traffic window.
+        Scheduled maintenance goes through MaintenancePlanner.run instead.
         """
-        conn = await DatabaseConnection.get_db_connection()
+        from util.core.maintenance import MaintenancePlanner
         try:
-            async with conn.cursor() as real_cursor:
-                cursor = LoggingCursor(real_cursor)
-                # Get total size before
-                await cursor.execute("""
-                    SELECT SUM(data_length + index_length)
-                    FROM information_schema.tables
-                    WHERE table_schema = DATABASE()
-                """)
-                before_size = await cursor.fetchone()
-                before_size = before_size[0] if before_size and before_size[0] is not None else 0
-
-                await cursor.execute("SHOW TABLES;")
-                tables = await cursor.fetchall()
-                if not tables:
-                    return "No tables found in the database to optimize."
-
-                optimized_tables = []
-                for (table_name,) in tables:
-                    await cursor.execute(f"OPTIMIZE TABLE `{table_name}`;")
-                    result = await cursor.fetchall()
-                    msg = result[0][3] if len(result[0]) > 3 else str(result[0])
-                    optimized_tables.append(f"{table_name}: {msg}")
-
-                # Get total size after
-                await cursor.execute("""
-                    SELECT SUM(data_length + index_length)
-                    FROM information_schema.tables
-                    WHERE table_schema = DATABASE()
-                """)
-                after_size = await cursor.fetchone()
-                after_size = after_size[0] if after_size and after_size[0] is not None else 0
-
-                return f"✅ Database VACUUM completed automatically. Size change: {SizeUtils.format_size(before_size)} -> {SizeUtils.format_size(after_size)}"
+            return await MaintenancePlanner.run(respect_window=False)
         except Exception as e:
             return f"❌ Vacuum operation failed: {e}"
-        finally:
-            conn.close()
     
     @staticmethod
     async def get_mysql_db_size(db_name=None):
@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class StateHandoff:
+    """
+    Carries in-memory state across cog reloads and process restarts.
+
+    Hot reload: a cog stashes its live state in cog_unload and the new instance
+    claims it in cog_load, so nothing is serialized and voice connections stay up.
+    Restart: cogs with snapshot_state() write JSON-safe state to HANDOFF_FILE before
+    the old process exits; the new process hands it back via restore_state(data)
+    once it is ready. Snapshots older than MAX_AGE are ignored.
+    """
+    HANDOFF_FILE = "restart_handoff.json"
+    MAX_AGE = 10 * 60  # seconds
+
+    @staticmethod
+    def stash(bot, name, state):
+        """Keep live state on the bot across a reload of the named cog."""
+        if not hasattr(bot, "_handoff_stash"):
+            bot._handoff_stash = {}
+        bot._handoff_stash[name] = state
+
+    @staticmethod
+    def is_reloading(bot):
+        """True while hot_reload is running, i.e. an unloading cog's state will be claimed."""
+        return hasattr(bot, "_handoff_claims")
+
+    @staticmethod
+    def claim(bot, name, default=None):
+        """Take stashed state for the named cog, if a previous instance left any."""
+        stash = getattr(bot, "_handoff_stash", {})
+        if name not in stash:
+            return default
+        if hasattr(bot, "_handoff_claims"):
+            bot._handoff_claims.append(name)
+        return stash.pop(name)
+
+    @staticmethod
+    async def hot_reload(bot, extension):
+        """Reload an extension in-process. Returns the cog names that took over live state."""
+        bot._handoff_claims = []
+        try:
+            await bot.reload_extension(extension)
+            return bot._handoff_claims
+        finally:
+            del bot._handoff_claims
+
+    @staticmethod
+    def snapshot_cogs(bot):
+        """Collect snapshot_state() from every cog that has state worth keeping."""
+        snapshots = {}
+        for name, cog in bot.cogs.items():
+            snapshot_state = getattr(cog, "snapshot_state", None)
+            if not snapshot_state:
+                continue
+            try:
+                data = snapshot_state()
+            except Exception as e:
+                logger.error(f"Failed to snapshot {name}: {e}", exc_info=True)
+                continue
+            if data:
+                snapshots[name] = data
+        return snapshots
+
+    @staticmethod
+    async def restore_cogs(bot, snapshots):
+        """Hand each snapshot back to its cog. Returns one summary line per cog."""
+        lines = []
+        for name, data in snapshots.items():
+            cog = bot.get_cog(name)
+            restore_state = getattr(cog, "restore_state", None)
+            if not restore_state:
+                lines.append(f"  [SKIP] {name} (not loaded)")
+                continue
+            try:
+                lines.append(f"  [OK]   {name} ({await restore_state(data)})")
+            except Exception as e:
+                logger.error(f"Failed to restore {name}: {e}", exc_info=True)
+                lines.append(f"  [FAIL] {name} ({e})")
+        return lines
+
+    @classmethod
+    def save(cls, handoff):
+        handoff["saved_at"] = time.time()
+        tmp_file = cls.HANDOFF_FILE + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(handoff, f)
+        os.replace(tmp_file, cls.HANDOFF_FILE)
+
+    @classmethod
+    def load(cls):
+        """Read and remove the handoff file, so it is restored at most once. Returns None when absent or stale."""
+        if not os.path.exists(cls.HANDOFF_FILE):
+            return None
+        try:
+            with open(cls.HANDOFF_FILE, "r") as f:
+                handoff = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to read restart handoff: {e}")
+            handoff = None
+        finally:
+            os.remove(cls.HANDOFF_FILE)
+        if handoff and time.time() - handoff.get("saved_at", 0) > cls.MAX_AGE:
+            logger.warning("Ignoring stale restart handoff")
+            return None
+        return handoff
@@ -1,8 +1,12 @@
 import asyncio
+import io
+import queue
 import time
 import logging
 from datetime import datetime, timezone
+import discord
 from .database import Database
+from .rollup import CommandStatsRollup
 
 logger = logging.getLogger(__name__)
 
@@ -90,19 +94,108 @@ class CommandLogger:
             command_log_cache.clear()
         try:
             async with bot.db.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.executemany('''
-                        INSERT INTO command_logs (
-                        log_id, user_id, username, channel_id, channel_name, guild_id,
-                        command_name, success, error, response_time, timestamp
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
-                        ''', entries)
-            await conn.commit()
+                # Logs and their rollup land together or not at all
+                await conn.begin()
+                try:
+                    async with conn.cursor() as cursor:
+                        await cursor.executemany('''
+                            INSERT INTO command_logs (
+                            log_id, user_id, username, channel_id, channel_name, guild_id,
+                            command_name, success, error, response_time, timestamp
+                            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                            ''', entries)
+                        await CommandStatsRollup.apply(cursor, entries)
+                    await conn.commit()
+                except Exception:
+                    await conn.rollback()
+                    raise
         except Exception as e:
             logger.error(f"Failed to flush command logs: {e}", exc_info=True)
         finally:
             elapsed = time.perf_counter() - start
         logger.info(f"Command log flush took {elapsed:.2f} seconds")
 
-_discord_log_buffer = []
-_discord_log_lock = asyncio.Lock()
\ No newline at end of file
+# Thread-safe queue fed by DiscordLogHandler; drained by DiscordLogShipper
+_discord_log_queue = queue.SimpleQueue()
+
+class DiscordLogShipper:
+    """Drain buffered log lines and ship them to the log channel in batches."""
+    MAX_MESSAGE_CHARS = 2000
+    MAX_INLINE_MESSAGES = 3
+    MAX_DRAIN = 5000
+
+    def __init__(self, bot, rate=5, per=5.0):
+        self.bot = bot
+        self.rate = rate
+        self.per = per
+        self._budgets = {}  # channel_id: (tokens, last_refill)
+
+    def drain(self):
+        """Pull every pending line off the queue without blocking."""
+        lines = []
+        while len(lines) < self.MAX_DRAIN:
+            try:
+                lines.append(_discord_log_queue.get_nowait())
+            except queue.Empty:
+                break
+        return lines
+
+    def build_payloads(self, lines):
+        """
+        Pack lines into code-block messages of at most MAX_MESSAGE_CHARS.
+        Returns (messages, file); file is set instead of messages when the
+        batch would need more than MAX_INLINE_MESSAGES messages.
+        """
+        limit = self.MAX_MESSAGE_CHARS - len("``````")
+        messages = []
+        chunk = ""
+        for line in lines:
+            line = line[:limit - 1]
+            # +1 for newline
+            if len(chunk) + len(line) + 1 > limit:
+                messages.append(f"```{chunk}```")
+                chunk = ""
+            chunk += line + "\n"
+        if chunk:
+            messages.append(f"```{chunk}```")
+
+        if len(messages) > self.MAX_INLINE_MESSAGES:
+            data = io.BytesIO("\n".join(lines).encode("utf-8"))
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+            return [], discord.File(data, filename=f"logs_{stamp}.txt")
+        return messages, None
+
+    def _consume(self, channel_id):
+        """Take one send from the channel's budget; returns seconds to wait first."""
+        now = time.monotonic()
+        tokens, last = self._budgets.get(channel_id, (self.rate, now))
+        tokens = min(self.rate, tokens + (now - last) * self.rate / self.per)
+        if tokens >= 1:
+            self._budgets[channel_id] = (tokens - 1, now)
+            return 0.0
+        wait = (1 - tokens) * self.per / self.rate
+        self._budgets[channel_id] = (0, now + wait)
+        return wait
+
+    async def send(self, channel, content=None, file=None):
+        wait = self._consume(channel.id)
+        if wait:
+            await asyncio.sleep(wait)
+        await channel.send(content=content, file=file)
+
+    async def flush(self):
+        """Ship everything currently queued. Returns the number of lines sent."""
+        lines = self.drain()
+        if not lines:
+            return 0
+        channel_id = getattr(self.bot, "log_channel_cache", None)
+        channel = self.bot.get_channel(channel_id) if channel_id else None
+        if not channel:
+            return 0
+
+        messages, file = self.build_payloads(lines)
+        if file:
+            await self.send(channel, content=f"📄 {len(lines)} log lines", file=file)
+        for message in messages:
+            await self.send(channel, content=message)
+        return len(lines)
\ No newline at end of file
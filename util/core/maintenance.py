@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from datetime import datetime
+from .database import DatabaseConnection
+from .utils import SizeUtils
+
+logger = logging.getLogger(__name__)
+
+class MaintenancePlanner:
+    """
+    Runs OPTIMIZE TABLE only where it pays off: tables whose free (fragmented)
+    space passes a threshold, one table at a time, during a quiet window.
+    Partitioned log tables are never rebuilt; retention drops their partitions.
+    Every run is recorded in maintenance_log with before/after sizes.
+    """
+    FRAGMENTATION_THRESHOLD = 0.2  # data_free / total allocated
+    MIN_FREE_BYTES = 16 * 1024 ** 2  # not worth a rebuild below this
+    LOW_TRAFFIC_HOURS = range(3, 6)  # server local time
+    QUIET_COMMANDS_PER_HOUR = 50  # from command_stats_hourly; above this the window is skipped
+    PAUSE_BETWEEN_TABLES = 30  # seconds
+
+    TABLE_STATS_QUERY = """
+        SELECT t.table_name, t.table_rows, t.data_length, t.index_length, t.data_free
+        FROM information_schema.tables t
+        WHERE t.table_schema = DATABASE()
+        AND t.table_type = 'BASE TABLE'
+        AND NOT EXISTS (
+            SELECT 1 FROM information_schema.partitions p
+            WHERE p.table_schema = t.table_schema
+            AND p.table_name = t.table_name
+            AND p.partition_name IS NOT NULL
+        )
+    """
+
+    @staticmethod
+    def needs_optimize(stats):
+        allocated = stats["data_length"] + stats["index_length"] + stats["data_free"]
+        if not allocated or stats["data_free"] < MaintenancePlanner.MIN_FREE_BYTES:
+            return False
+        return stats["data_free"] / allocated >= MaintenancePlanner.FRAGMENTATION_THRESHOLD
+
+    @staticmethod
+    async def get_table_stats(cursor, table_name=None):
+        """Return {table_name: stats} from information_schema, optionally for a single table."""
+        if table_name:
+            await cursor.execute(MaintenancePlanner.TABLE_STATS_QUERY + " AND t.table_name = %s", (table_name,))
+        else:
+            await cursor.execute(MaintenancePlanner.TABLE_STATS_QUERY)
+        return {
+            row[0]: {
+                "table_rows": row[1] or 0,
+                "data_length": row[2] or 0,
+                "index_length": row[3] or 0,
+                "data_free": row[4] or 0,
+            }
+            for row in await cursor.fetchall()
+        }
+
+    @classmethod
+    async def plan(cls, cursor):
+        """Tables due for OPTIMIZE, most free space first."""
+        stats = await cls.get_table_stats(cursor)
+        due = [(name, s) for name, s in stats.items() if cls.needs_optimize(s)]
+        return sorted(due, key=lambda item: item[1]["data_free"], reverse=True)
+
+    @classmethod
+    async def is_quiet(cls, cursor):
+        """In the low-traffic window and not busy right now."""
+        await cursor.execute("SELECT HOUR(NOW())")
+        if (await cursor.fetchone())[0] not in cls.LOW_TRAFFIC_HOURS:
+            return False
+        await cursor.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM command_stats_hourly WHERE hour = DATE_FORMAT(NOW(), '%Y-%m-%d %H:00:00')"
+        )
+        return (await cursor.fetchone())[0] < cls.QUIET_COMMANDS_PER_HOUR
+
+    @classmethod
+    async def run(cls, respect_window=True):
+        """
+        Optimize every due table, one at a time. With respect_window, nothing runs
+        outside the quiet window. Returns a summary string.
+        """
+        conn = await DatabaseConnection.get_db_connection()
+        try:
+            async with conn.cursor() as cursor:
+                if respect_window and not await cls.is_quiet(cursor):
+                    return None
+                due = await cls.plan(cursor)
+                if not due:
+                    return "✅ Database maintenance: no table needs optimizing."
+
+                results = []
+                for i, (table_name, before) in enumerate(due):
+                    if i:
+                        await asyncio.sleep(cls.PAUSE_BETWEEN_TABLES)
+                        if respect_window and not await cls.is_quiet(cursor):
+                            results.append("stopped: left the quiet window")
+                            break
+                    started_at = datetime.now()
+                    try:
+                        await cursor.execute(f"OPTIMIZE TABLE `{table_name}`")
+                        result = await cursor.fetchall()
+                        msg = result[-1][3] if result and len(result[-1]) > 3 else str(result)
+                    except Exception as e:
+                        msg = f"failed: {e}"
+                    after = (await cls.get_table_stats(cursor, table_name)).get(table_name, before)
+                    await cls.record(cursor, table_name, started_at, before, after, msg)
+                    results.append(
+                        f"{table_name}: {SizeUtils.format_size(before['data_length'] + before['index_length'] + before['data_free'])} -> "
+                        f"{SizeUtils.format_size(after['data_length'] + after['index_length'] + after['data_free'])} ({msg})"
+                    )
+                return "✅ Database maintenance completed:\n" + "\n".join(results)
+        finally:
+            conn.close()
+
+    @staticmethod
+    async def record(cursor, table_name, started_at, before, after, result):
+        await cursor.execute("""
+            INSERT INTO maintenance_log (
+                table_name, started_at, finished_at, table_rows,
+                data_length_before, index_length_before, data_free_before,
+                data_length_after, index_length_after, data_free_after, result
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            table_name, started_at.isoformat(sep=' ', timespec='seconds'),
+            datetime.now().isoformat(sep=' ', timespec='seconds'), before["table_rows"],
+            before["data_length"], before["index_length"], before["data_free"],
+            after["data_length"], after["index_length"], after["data_free"], str(result)[:255]
+        ))
@@ -0,0 +1,128 @@
+import logging
+from datetime import date, timedelta
+from .database import DatabaseConnection
+
+logger = logging.getLogger(__name__)
+
+class LogPartitions:
+    """
+    Daily RANGE COLUMNS partitioning for the append-only log tables.
+    Partition p<YYYYMMDD> holds that day's rows; pmax catches anything past the
+    last premade day. Retention drops whole partitions instead of deleting rows.
+    Command stats survive the drop in the rollup tables (see CommandStatsRollup).
+    """
+    TABLES = {
+        "command_logs": {"column": "timestamp", "primary_key": "log_id", "retention_days": 90},
+        "query_logs": {"column": "created_at", "primary_key": "id", "retention_days": 7},
+    }
+    PREMAKE_DAYS = 3
+
+    @staticmethod
+    def partition_name(day):
+        return f"p{day:%Y%m%d}"
+
+    @staticmethod
+    def partition_clause(day):
+        """Partition holding every row from day (inclusive) to the next day."""
+        return f"PARTITION {LogPartitions.partition_name(day)} VALUES LESS THAN ('{day + timedelta(days=1):%Y-%m-%d}')"
+
+    @staticmethod
+    def parse_day(bound):
+        return date.fromisoformat(bound)
+
+    @staticmethod
+    async def get_today(cursor):
+        """The database server's date, which is what NOW() stamps on the log rows."""
+        await cursor.execute("SELECT CURDATE()")
+        return (await cursor.fetchone())[0]
+
+    @staticmethod
+    async def get_partitions(cursor, table):
+        """Return [(partition_name, upper_bound)] in order; upper_bound is None for MAXVALUE."""
+        await cursor.execute("""
+            SELECT partition_name, partition_description
+            FROM information_schema.partitions
+            WHERE table_schema = DATABASE() AND table_name = %s AND partition_name IS NOT NULL
+            ORDER BY partition_ordinal_position
+        """, (table,))
+        partitions = []
+        for name, description in await cursor.fetchall():
+            bound = None if description == "MAXVALUE" else description.strip("'")[:10]
+            partitions.append((name, bound))
+        return partitions
+
+    @classmethod
+    async def partition_table(cls, cursor, table):
+        """
+        Convert an unpartitioned log table in place. The partition column joins the
+        primary key, as MySQL requires. Returns True if the table was converted.
+        """
+        if await cls.get_partitions(cursor, table):
+            return False
+        config = cls.TABLES[table]
+        column, primary_key = config["column"], config["primary_key"]
+        today = await cls.get_today(cursor)
+
+        # Everything logged before today goes into one history partition, dropped once it ages out
+        clauses = [f"PARTITION p_history VALUES LESS THAN ('{today:%Y-%m-%d}')"]
+        clauses += [cls.partition_clause(today + timedelta(days=i)) for i in range(cls.PREMAKE_DAYS + 1)]
+        clauses.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+
+        await cursor.execute(f"UPDATE `{table}` SET `{column}` = '1970-01-01 00:00:00' WHERE `{column}` IS NULL")
+        await cursor.execute(f"""
+            ALTER TABLE `{table}`
+                MODIFY `{column}` VARCHAR(50) NOT NULL,
+                DROP PRIMARY KEY,
+                ADD PRIMARY KEY (`{primary_key}`, `{column}`)
+            PARTITION BY RANGE COLUMNS(`{column}`) (
+                {", ".join(clauses)}
+            )
+        """)
+        logger.info(f"Partitioned {table} by day on {column}")
+        return True
+
+    @classmethod
+    async def rollover(cls, cursor, table):
+        """Premake the next PREMAKE_DAYS partitions and drop those past retention."""
+        partitions = await cls.get_partitions(cursor, table)
+        if not partitions:
+            logger.warning(f"{table} is not partitioned; run init_db.py --migrate")
+            return 0, 0
+        today = await cls.get_today(cursor)
+
+        # Split new days off the front of pmax; it is empty unless writes got ahead of the premade days
+        bounds = [bound for _, bound in partitions if bound]
+        next_day = today if not bounds else max(today, cls.parse_day(max(bounds)))
+        new_days = []
+        while next_day <= today + timedelta(days=cls.PREMAKE_DAYS):
+            new_days.append(next_day)
+            next_day += timedelta(days=1)
+        if new_days:
+            clauses = [cls.partition_clause(day) for day in new_days]
+            clauses.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+            await cursor.execute(f"ALTER TABLE `{table}` REORGANIZE PARTITION pmax INTO ({', '.join(clauses)})")
+
+        # A partition is expired once its upper bound is on or before the cutoff
+        cutoff = today - timedelta(days=cls.TABLES[table]["retention_days"])
+        expired = [name for name, bound in partitions if bound and cls.parse_day(bound) <= cutoff]
+        if expired:
+            await cursor.execute(f"ALTER TABLE `{table}` DROP PARTITION {', '.join(expired)}")
+        return len(new_days), len(expired)
+
+    @classmethod
+    async def rollover_all(cls):
+        """Run rollover on every partitioned log table. Returns a summary string."""
+        conn = await DatabaseConnection.get_db_connection()
+        results = []
+        try:
+            async with conn.cursor() as cursor:
+                for table in cls.TABLES:
+                    try:
+                        created, dropped = await cls.rollover(cursor, table)
+                        results.append(f"{table}: +{created}/-{dropped}")
+                    except Exception as e:
+                        logger.error(f"Partition rollover failed for {table}: {e}", exc_info=True)
+                        results.append(f"{table}: failed")
+        finally:
+            conn.close()
+        return f"🗂️ Log partitions rolled over ({', '.join(results)})"
@@ -0,0 +1,197 @@
+import math
+import logging
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+class CommandStatsRollup:
+    """
+    Per-command, per-hour aggregates of command_logs, updated at flush time.
+    Response times also go into log-scale histogram buckets (bucket i covers
+    (GAMMA^(i-1), GAMMA^i]), which merge by addition across hours and give
+    quantiles within about (GAMMA - 1) / 2 relative error.
+    """
+    GAMMA = 1.1
+    MIN_TIME = 0.0001
+
+    @classmethod
+    def bucket_index(cls, seconds):
+        return math.ceil(math.log(max(seconds, cls.MIN_TIME)) / math.log(cls.GAMMA))
+
+    @classmethod
+    def bucket_value(cls, index):
+        """Representative response time for a bucket (the midpoint in relative terms)."""
+        return 2 * cls.GAMMA ** index / (cls.GAMMA + 1)
+
+    @classmethod
+    def quantile(cls, buckets, q):
+        """Estimate the q-quantile from {bucket_index: count}."""
+        total = sum(buckets.values())
+        if not total:
+            return 0
+        rank = q * (total - 1)
+        seen = 0
+        for index in sorted(buckets):
+            seen += buckets[index]
+            if seen > rank:
+                return cls.bucket_value(index)
+        return cls.bucket_value(max(buckets))
+
+    @staticmethod
+    def aggregate(entries):
+        """
+        Fold flushed command_logs rows into per-command and per-user aggregates.
+        Entries use the command_logs flush layout:
+        (log_id, user_id, username, channel_id, channel_name, guild_id, command_name, success, error, response_time)
+        """
+        commands = defaultdict(lambda: {"count": 0, "success_count": 0, "timed_count": 0, "sum_time": 0.0, "min_time": None, "max_time": None, "buckets": Counter()})
+        users = defaultdict(lambda: {"count": 0, "timed_count": 0, "sum_time": 0.0, "max_time": None})
+        for entry in entries:
+            user_id, command_name, success, response_time = entry[1], entry[6], entry[7], entry[9]
+            command = commands[command_name]
+            user = users[user_id]
+            command["count"] += 1
+            user["count"] += 1
+            if success:
+                command["success_count"] += 1
+            if response_time is None:
+                continue
+            response_time = float(response_time)
+            for stats in (command, user):
+                stats["timed_count"] += 1
+                stats["sum_time"] += response_time
+                stats["max_time"] = response_time if stats["max_time"] is None else max(stats["max_time"], response_time)
+            command["min_time"] = response_time if command["min_time"] is None else min(command["min_time"], response_time)
+            command["buckets"][CommandStatsRollup.bucket_index(response_time)] += 1
+        return commands, users
+
+    @classmethod
+    async def apply(cls, cursor, entries):
+        """Add a batch of flushed command log rows to the rollup tables, in the caller's transaction."""
+        if not entries:
+            return
+        commands, users = cls.aggregate(entries)
+
+        # Same clock and timezone as the NOW() the flush stamps on command_logs
+        await cursor.execute("SELECT DATE_FORMAT(NOW(), '%Y-%m-%d %H:00:00')")
+        hour = (await cursor.fetchone())[0]
+
+        await cursor.executemany('''
+            INSERT INTO command_stats_hourly (hour, command_name, count, success_count, timed_count, sum_time, min_time, max_time)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s) AS new
+            ON DUPLICATE KEY UPDATE
+                count = command_stats_hourly.count + new.count,
+                success_count = command_stats_hourly.success_count + new.success_count,
+                timed_count = command_stats_hourly.timed_count + new.timed_count,
+                sum_time = command_stats_hourly.sum_time + new.sum_time,
+                min_time = LEAST(COALESCE(command_stats_hourly.min_time, new.min_time), COALESCE(new.min_time, command_stats_hourly.min_time)),
+                max_time = GREATEST(COALESCE(command_stats_hourly.max_time, new.max_time), COALESCE(new.max_time, command_stats_hourly.max_time))
+        ''', [
+            (hour, name, s["count"], s["success_count"], s["timed_count"], s["sum_time"], s["min_time"], s["max_time"])
+            for name, s in commands.items()
+        ])
+
+        bucket_rows = [
+            (hour, name, index, count)
+            for name, s in commands.items()
+            for index, count in s["buckets"].items()
+        ]
+        if bucket_rows:
+            await cursor.executemany('''
+                INSERT INTO command_stats_buckets (hour, command_name, bucket, count)
+                VALUES (%s, %s, %s, %s) AS new
+                ON DUPLICATE KEY UPDATE count = command_stats_buckets.count + new.count
+            ''', bucket_rows)
+
+        await cursor.executemany('''
+            INSERT INTO command_user_stats (user_id, count, timed_count, sum_time, max_time)
+            VALUES (%s, %s, %s, %s, %s) AS new
+            ON DUPLICATE KEY UPDATE
+                count = command_user_stats.count + new.count,
+                timed_count = command_user_stats.timed_count + new.timed_count,
+                sum_time = command_user_stats.sum_time + new.sum_time,
+                max_time = GREATEST(COALESCE(command_user_stats.max_time, new.max_time), COALESCE(new.max_time, command_user_stats.max_time))
+        ''', [
+            (user_id, s["count"], s["timed_count"], s["sum_time"], s["max_time"])
+            for user_id, s in users.items() if user_id is not None
+        ])
+
+    @classmethod
+    async def apply_completion(cls, cursor, log_id, response_time, success=True):
+        """
+        Record a completion that arrived after its command_logs row was flushed.
+        The row was counted at flush time without a response time, so the timing
+        and success go into that same hour's rollup, in the caller's transaction.
+        Returns False if the row is unknown or already timed.
+        """
+        await cursor.execute('''
+            SELECT user_id, command_name, success, response_time, DATE_FORMAT(timestamp, '%%Y-%%m-%%d %%H:00:00')
+            FROM command_logs
+            WHERE log_id = %s
+            FOR UPDATE
+        ''', (log_id,))
+        row = await cursor.fetchone()
+        if not row or row[3] is not None:
+            return False
+        user_id, command_name, was_success, _, hour = row
+        success_delta = 1 if success and not was_success else 0
+
+        await cursor.execute('''
+            UPDATE command_logs
+            SET success = %s, error = %s, response_time = %s
+            WHERE log_id = %s
+        ''', (success, None, response_time, log_id))
+        await cursor.execute('''
+            INSERT INTO command_stats_hourly (hour, command_name, count, success_count, timed_count, sum_time, min_time, max_time)
+            VALUES (%s, %s, 0, %s, 1, %s, %s, %s) AS new
+            ON DUPLICATE KEY UPDATE
+                success_count = command_stats_hourly.success_count + new.success_count,
+                timed_count = command_stats_hourly.timed_count + 1,
+                sum_time = command_stats_hourly.sum_time + new.sum_time,
+                min_time = LEAST(COALESCE(command_stats_hourly.min_time, new.min_time), new.min_time),
+                max_time = GREATEST(COALESCE(command_stats_hourly.max_time, new.max_time), new.max_time)
+        ''', (hour, command_name, success_delta, response_time, response_time, response_time))
+        await cursor.execute('''
+            INSERT INTO command_stats_buckets (hour, command_name, bucket, count)
+            VALUES (%s, %s, %s, 1) AS new
+            ON DUPLICATE KEY UPDATE count = command_stats_buckets.count + 1
+        ''', (hour, command_name, cls.bucket_index(response_time)))
+        if user_id is not None:
+            await cursor.execute('''
+                INSERT INTO command_user_stats (user_id, count, timed_count, sum_time, max_time)
+                VALUES (%s, 0, 1, %s, %s) AS new
+                ON DUPLICATE KEY UPDATE
+                    timed_count = command_user_stats.timed_count + 1,
+                    sum_time = command_user_stats.sum_time + new.sum_time,
+                    max_time = GREATEST(COALESCE(command_user_stats.max_time, new.max_time), new.max_time)
+            ''', (user_id, response_time, response_time))
+        return True
+
+    @classmethod
+    async def backfill(cls, cursor):
+        """Rebuild the rollup tables from every row already in command_logs."""
+        await cursor.execute("DELETE FROM command_stats_hourly")
+        await cursor.execute("DELETE FROM command_stats_buckets")
+        await cursor.execute("DELETE FROM command_user_stats")
+        await cursor.execute('''
+            INSERT INTO command_stats_hourly (hour, command_name, count, success_count, timed_count, sum_time, min_time, max_time)
+            SELECT DATE_FORMAT(timestamp, '%Y-%m-%d %H:00:00'), command_name,
+                   COUNT(*), COALESCE(SUM(success), 0), COUNT(response_time), COALESCE(SUM(response_time), 0), MIN(response_time), MAX(response_time)
+            FROM command_logs
+            GROUP BY 1, 2
+        ''')
+        await cursor.execute(f'''
+            INSERT INTO command_stats_buckets (hour, command_name, bucket, count)
+            SELECT DATE_FORMAT(timestamp, '%Y-%m-%d %H:00:00'), command_name,
+                   CEIL(LN(GREATEST(response_time, {cls.MIN_TIME})) / LN({cls.GAMMA})), COUNT(*)
+            FROM command_logs
+            WHERE response_time IS NOT NULL
+            GROUP BY 1, 2, 3
+        ''')
+        await cursor.execute('''
+            INSERT INTO command_user_stats (user_id, count, timed_count, sum_time, max_time)
+            SELECT user_id, COUNT(*), COUNT(response_time), COALESCE(SUM(response_time), 0), MAX(response_time)
+            FROM command_logs
+            WHERE user_id IS NOT NULL
+            GROUP BY user_id
+        ''')
@@ -0,0 +1,64 @@
+import logging
+from util.core.database import Database
+
+logger = logging.getLogger(__name__)
+
+class GuildSettings:
+    """
+    In-memory view of the guild_settings table.
+    All guilds are loaded in one query; writes go to the database first and
+    then to the cache, so reads never touch the database.
+    """
+    _cache = {}  # guild_id: {key: value}
+    _loaded = False
+
+    @classmethod
+    async def load_all(cls):
+        """Bulk-load every guild's settings. Returns the number of rows loaded."""
+        rows = await Database.fetch("SELECT guild_id, `key`, value FROM guild_settings")
+        cache = {}
+        for row in rows:
+            cache.setdefault(str(row["guild_id"]), {})[row["key"]] = row["value"]
+        cls._cache = cache
+        cls._loaded = True
+        return len(rows)
+
+    @classmethod
+    async def _ensure_loaded(cls):
+        if not cls._loaded:
+            await cls.load_all()
+
+    @classmethod
+    async def get_setting(cls, key, guild_id, default=None):
+        """Get a single setting for a guild."""
+        await cls._ensure_loaded()
+        return cls._cache.get(str(guild_id), {}).get(key, default)
+
+    @classmethod
+    async def get_settings(cls, guild_id, keys=None):
+        """Get a copy of a guild's settings, optionally limited to the given keys."""
+        await cls._ensure_loaded()
+        settings = cls._cache.get(str(guild_id), {})
+        if keys is None:
+            return dict(settings)
+        return {key: settings[key] for key in keys if key in settings}
+
+    @classmethod
+    async def set_setting(cls, key, value, guild_id):
+        """Write a setting through to the database and the cache."""
+        await cls._ensure_loaded()
+        await Database.execute(
+            "INSERT INTO guild_settings (guild_id, `key`, value) VALUES (%s, %s, %s) AS new ON DUPLICATE KEY UPDATE value = new.value",
+            str(guild_id), key, value
+        )
+        cls._cache.setdefault(str(guild_id), {})[key] = value
+
+    @classmethod
+    async def delete_setting(cls, key, guild_id):
+        """Delete a setting from the database and the cache."""
+        await cls._ensure_loaded()
+        await Database.execute(
+            "DELETE FROM guild_settings WHERE guild_id = %s AND `key` = %s",
+            str(guild_id), key
+        )
+        cls._cache.get(str(guild_id), {}).pop(key, None)
@@ -1,10 +1,16 @@
 import os
-import logging
+import sys
+import time
 import asyncio
+import builtins
+import logging
+import logging.handlers
+import random
+from collections import defaultdict, deque
 import discord
 
 from util.owner import BlacklistQueries
-from util.core.logger import _discord_log_buffer, _discord_log_lock
+from util.core.logger import _discord_log_queue
 
 class Startup:
     @staticmethod
@@ -41,19 +47,97 @@ class Startup:
             log_channel = await LoggingThreshold.get_log_channel(conn)
             bot.log_channel_cache = int(log_channel) if log_channel else None
 
-class DiscordLogHandler(logging.Handler):
-    def __init__(self, bot):
-        super().__init__()
+class StartupPhases:
+    """Times named startup phases; independent phases can be run concurrently."""
+
+    def __init__(self):
+        self.timings = []  # [(name, seconds)] in completion order
+
+    async def run(self, name, coro):
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.timings.append((name, time.perf_counter() - start))
+
+    async def run_concurrently(self, phases):
+        """Run {name: coroutine} together. A failing phase is logged and returns None; the rest still finish."""
+        names = list(phases)
+        results = await asyncio.gather(*(self.run(name, phases[name]) for name in names), return_exceptions=True)
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logging.getLogger(__name__).error(f"Startup phase {name} failed: {result}", exc_info=result)
+        return {name: None if isinstance(result, Exception) else result for name, result in zip(names, results)}
+
+    def summary(self):
+        width = max((len(name) for name, _ in self.timings), default=0)
+        return "Startup Phases:\n" + "\n".join(f"  {name:<{width}}  {elapsed:.2f}s" for name, elapsed in self.timings)
+
+class ImportProfiler:
+    """
+    Times first-time absolute imports while active (cumulative, like -X importtime),
+    so the startup report can name the modules that make cogs slow to load.
+    """
+
+    def __init__(self):
+        self.timings = {}  # module name: seconds, including its own imports
+        self._original_import = None
+
+    def __enter__(self):
+        original_import = self._original_import = builtins.__import__
+        timings = self.timings
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+            start = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                timings.setdefault(name, time.perf_counter() - start)
+
+        builtins.__import__ = timed_import
+        return self
+
+    def __exit__(self, *exc_info):
+        builtins.__import__ = self._original_import
+
+    def slowest(self, limit=10):
+        return sorted(self.timings.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def summary(self, limit=10):
+        return "Slowest Imports:\n" + "\n".join(f"  {name:<40} {elapsed:.3f}s" for name, elapsed in self.slowest(limit))
+
+class DiscordLogHandler(logging.handlers.QueueHandler):
+    # Fraction of records shipped per level; WARNING and above always ship
+    DEFAULT_SAMPLE_RATES = {
+        logging.DEBUG: 0.1,
+        logging.INFO: 1.0,
+    }
+
+    def __init__(self, bot, channel_id=None, sample_rates=None):
+        super().__init__(_discord_log_queue)
         self.bot = bot
+        if channel_id:
+            bot.log_channel_cache = int(channel_id)
+        self.sample_rates = dict(self.DEFAULT_SAMPLE_RATES)
+        if sample_rates:
+            self.sample_rates.update(sample_rates)
 
-    def emit(self, record):
-        log_entry = self.format(record)
-        # Buffer the log instead of sending immediately
-        asyncio.create_task(self.buffer_log(log_entry))
+    def sampled(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.sample_rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
 
-    async def buffer_log(self, log_entry):
-        async with _discord_log_lock:
-            _discord_log_buffer.append(log_entry)
+    def prepare(self, record):
+        # Only the formatted line is queued; the shipper never touches records
+        return self.format(record)
+
+    def emit(self, record):
+        # Safe from any thread: SimpleQueue.put never blocks and needs no event loop
+        if self.sampled(record):
+            super().emit(record)
 
 class DMZcordLogger:
     def __init__(self, level=logging.INFO, format_str="[%(asctime)s]: %(message)s"):
@@ -127,17 +211,107 @@ class LoggingThreshold:
         await conn.commit()
 
 class MessageLogger:
+    LOG_CATEGORY_NAME = "Modmail"
+    LOG_CHANNEL_NAME = "message-logs"
+
+    # Above DIGEST_THRESHOLD events per DIGEST_WINDOW seconds, embeds are held for a digest post
+    DIGEST_THRESHOLD = 5
+    DIGEST_WINDOW = 10
+    EMBEDS_PER_MESSAGE = 10
+    CHARS_PER_MESSAGE = 6000  # Discord's total across all embeds in one message
+
+    _log_channel_cache = {}  # guild_id: channel_id or None
+    _recent_events = defaultdict(deque)  # guild_id: event timestamps
+    _pending_digests = defaultdict(list)  # channel_id: [embeds]
+
+    @classmethod
+    def get_log_channel(cls, guild):
+        """Return the guild's message-logs channel, resolving it once per guild."""
+        if guild.id not in cls._log_channel_cache:
+            channel_id = None
+            category = discord.utils.get(guild.categories, name=cls.LOG_CATEGORY_NAME)
+            if category:
+                log_channel = discord.utils.get(category.channels, name=cls.LOG_CHANNEL_NAME)
+                channel_id = log_channel.id if log_channel else None
+            cls._log_channel_cache[guild.id] = channel_id
+
+        channel_id = cls._log_channel_cache[guild.id]
+        return guild.get_channel(channel_id) if channel_id else None
+
+    @classmethod
+    def invalidate_log_channel(cls, guild_id):
+        """Forget the cached log channel so the next lookup walks the guild again."""
+        cls._log_channel_cache.pop(guild_id, None)
+
+    @classmethod
+    def _is_busy(cls, guild_id):
+        now = time.monotonic()
+        events = cls._recent_events[guild_id]
+        events.append(now)
+        while events and now - events[0] > cls.DIGEST_WINDOW:
+            events.popleft()
+        return len(events) > cls.DIGEST_THRESHOLD
+
+    @classmethod
+    async def _dispatch(cls, guild, log_channel, embed):
+        """Send the embed now, or hold it for the next digest when the guild is busy."""
+        if cls._is_busy(guild.id) or cls._pending_digests.get(log_channel.id):
+            cls._pending_digests[log_channel.id].append(embed)
+            return
+        await log_channel.send(embed=embed)
+
+    @classmethod
+    def batch_embeds(cls, embeds):
+        """Group embeds into messages within EMBEDS_PER_MESSAGE and CHARS_PER_MESSAGE."""
+        batches = []
+        batch, chars = [], 0
+        for embed in embeds:
+            size = len(embed)
+            if batch and (len(batch) >= cls.EMBEDS_PER_MESSAGE or chars + size > cls.CHARS_PER_MESSAGE):
+                batches.append(batch)
+                batch, chars = [], 0
+            batch.append(embed)
+            chars += size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @classmethod
+    async def flush_digests(cls, bot):
+        """
+        Post held embeds, batched within Discord's per-message limits. If a send
+        fails, that batch and the rest for the channel go back on the queue for the
+        next flush; a channel that is gone or forbidden is dropped and logged.
+        """
+        pending = dict(cls._pending_digests)
+        cls._pending_digests.clear()
+        for channel_id, embeds in pending.items():
+            channel = bot.get_channel(channel_id)
+            if not channel:
+                logging.getLogger(__name__).warning(f"Dropped {len(embeds)} message log embed(s): channel {channel_id} not found")
+                continue
+            batches = cls.batch_embeds(embeds)
+            for i, batch in enumerate(batches):
+                try:
+                    await channel.send(embeds=batch)
+                except (discord.Forbidden, discord.NotFound) as e:
+                    unsent = sum(len(b) for b in batches[i:])
+                    logging.getLogger(__name__).warning(f"Dropped {unsent} message log embed(s) for channel {channel_id}: {e}")
+                    cls.invalidate_log_channel(getattr(channel.guild, "id", None))
+                    break
+                except Exception as e:
+                    unsent = [embed for b in batches[i:] for embed in b]
+                    logging.getLogger(__name__).warning(f"Failed to post message log digest to channel {channel_id}, requeueing {len(unsent)} embed(s): {e}")
+                    cls._pending_digests[channel_id][:0] = unsent
+                    break
+
     @staticmethod
     async def log_deleted_message(message):
         """Log deleted messages."""
         if message.author.bot or not message.guild:
             return
 
-        category = discord.utils.get(message.guild.categories, name="Modmail")
-        if not category:
-            return
-
-        log_channel = discord.utils.get(category.channels, name="message-logs")
+        log_channel = MessageLogger.get_log_channel(message.guild)
         if not log_channel:
             return
 
@@ -155,7 +329,7 @@ class MessageLogger:
         embed.set_thumbnail(url=message.author.display_avatar.url)
         embed.timestamp = message.created_at
 
-        await log_channel.send(embed=embed)
+        await MessageLogger._dispatch(message.guild, log_channel, embed)
 
     @staticmethod
     async def log_edited_message(before, after):
@@ -163,11 +337,7 @@ class MessageLogger:
         if before.author.bot or not before.guild or before.content == after.content:
             return
 
-        category = discord.utils.get(before.guild.categories, name="Modmail")
-        if not category:
-            return
-
-        log_channel = discord.utils.get(category.channels, name="message-logs")
+        log_channel = MessageLogger.get_log_channel(before.guild)
         if not log_channel:
             return
 
@@ -192,4 +362,4 @@ class MessageLogger:
         embed.add_field(name="After", value=after_content, inline=False)
         embed.timestamp = before.edited_at or before.created_at
 
-        await log_channel.send(embed=embed)
+        await MessageLogger._dispatch(before.guild, log_channel, embed)
@@ -1,48 +1,94 @@
+import time
+import discord
 from discord.ext import commands
 from util.core.utils import MockContext
 
 
 class HelpFilter:
+    """
+    Decides which commands a user sees in help. The visible set is cached per
+    (user, guild, channel) for CACHE_TTL, since the blacklist and permission
+    checks depend on the channel. The bot-wide checks (the blacklist check
+    queries the database) run once per render instead of once per command.
+    """
+    CACHE_TTL = 60  # seconds
+    MAX_ENTRIES = 1000
+
+    _visible_cache = {}  # (user_id, guild_id, channel_id): (expires, frozenset of qualified names)
+
     @staticmethod
-    async def organize_by_cog(bot, user=None, guild=None):
-        """Organize commands by cog, filtering by user permissions."""
-        cogs_with_commands = {}
+    async def passes_command_checks(cmd, ctx):
+        """Command.can_run without the bot-wide checks: enabled, cog_check and the command's own checks."""
+        if not cmd.enabled:
+            return False
+        original = ctx.command
+        ctx.command = cmd
+        try:
+            if cmd.cog is not None:
+                local_check = commands.Cog._get_overridden_method(cmd.cog.cog_check)
+                if local_check is not None and not await discord.utils.maybe_coroutine(local_check, ctx):
+                    return False
+            return await discord.utils.async_all(predicate(ctx) for predicate in cmd.checks)
+        except Exception:
+            return False
+        finally:
+            ctx.command = original
 
-        for cog_name, cog in bot.cogs.items():
-            commands_list = []
+    @classmethod
+    async def visible_commands(cls, bot, ctx):
+        """Qualified names of the commands the context's user can run."""
+        user = ctx.author if hasattr(ctx, "author") else ctx.user
+        key = (user.id, ctx.guild.id if ctx.guild else None, getattr(ctx.channel, "id", None))
+        now = time.monotonic()
+        cached = cls._visible_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
 
-            for cmd in cog.get_commands():
-                if cmd.hidden:
-                    continue
+        try:
+            allowed = await bot.can_run(ctx)
+        except commands.CommandError:
+            allowed = False
+        except Exception:
+            # Don't cache an empty menu because the database hiccuped
+            return frozenset()
+        visible = frozenset([
+            cmd.qualified_name for cmd in bot.commands
+            if await cls.passes_command_checks(cmd, ctx)
+        ]) if allowed else frozenset()
 
-                # Check if user has permissions for this command
-                if user and guild:
-                    try:
-                        can_run = await cmd.can_run(MockContext(user, guild, bot))
-                        if not can_run:
-                            continue
-                    except commands.CommandError:
-                        continue
+        if len(cls._visible_cache) >= cls.MAX_ENTRIES:
+            cls._visible_cache = {k: v for k, v in cls._visible_cache.items() if v[0] > now}
+        cls._visible_cache[key] = (now + cls.CACHE_TTL, visible)
+        return visible
 
-                commands_list.append(cmd)
+    @classmethod
+    def invalidate(cls, user_id=None):
+        """Drop cached visible sets, for one user or everyone (channel and guild blacklist changes)."""
+        if user_id is None:
+            cls._visible_cache.clear()
+        else:
+            user_id = int(user_id)
+            cls._visible_cache = {k: v for k, v in cls._visible_cache.items() if k[0] != user_id}
 
+    @classmethod
+    async def organize_by_cog(cls, bot, user=None, guild=None):
+        """Organize commands by cog, filtering by user permissions."""
+        visible = await cls.visible_commands(bot, MockContext(user, guild, bot)) if user and guild else None
+
+        cogs_with_commands = {}
+        for cog_name, cog in bot.cogs.items():
+            commands_list = [
+                cmd for cmd in cog.get_commands()
+                if not cmd.hidden and (visible is None or cmd.qualified_name in visible)
+            ]
             if commands_list:
                 cogs_with_commands[cog_name] = commands_list
 
         # Handle uncategorized commands
-        uncategorized = []
-        for cmd in bot.commands:
-            if not cmd.cog_name and not cmd.hidden:
-                if user and guild:
-                    try:
-                        can_run = await cmd.can_run(MockContext(user, guild, bot))
-                        if can_run:
-                            uncategorized.append(cmd)
-                    except commands.CommandError:
-                        continue
-                else:
-                    uncategorized.append(cmd)
-
+        uncategorized = [
+            cmd for cmd in bot.commands
+            if not cmd.cog_name and not cmd.hidden and (visible is None or cmd.qualified_name in visible)
+        ]
         if uncategorized:
             cogs_with_commands["Uncategorized"] = uncategorized
 
@@ -5,6 +5,7 @@ import discord
 from datetime import datetime
 import logging
 from typing import List, Tuple, Optional, Union
+from util.general.filter import HelpFilter
 
 logger = logging.getLogger(__name__)
 
@@ -59,16 +60,8 @@ class GeneralHelpers:
     @staticmethod
     async def filter_help_commands(cmd, ctx, bot):
         """Return True if the command should be visible to the user in help."""
-        try:
-            # Owner-only check
-            is_owner = await bot.is_owner(ctx.author if hasattr(ctx, "author") else ctx.user)
-            is_owner_only = any(getattr(check, "__qualname__", "").startswith("is_owner") for check in getattr(cmd, "checks", []))
-            if is_owner_only and not is_owner:
-                return False
-            # Permission and all other checks
-            return await cmd.can_run(ctx)
-        except Exception:
-            return False
+        # Checked against the cached visible set, so view transitions make no database calls
+        return cmd.qualified_name in await HelpFilter.visible_commands(bot, ctx)
 
 
 class MessageHelper:
@@ -98,15 +91,22 @@ class MessageHelper:
     @staticmethod
     async def get_or_create_log_channel(guild: discord.Guild) -> discord.TextChannel:
         """Get or create the message logs channel in Modmail category"""
-        modmail_category = discord.utils.get(guild.categories, name="Modmail")
+        from util.core import MessageLogger
+
+        log_channel = MessageLogger.get_log_channel(guild)
+        if log_channel:
+            return log_channel
+
+        modmail_category = discord.utils.get(guild.categories, name=MessageLogger.LOG_CATEGORY_NAME)
         if not modmail_category:
-            modmail_category = await guild.create_category("Modmail")
+            modmail_category = await guild.create_category(MessageLogger.LOG_CATEGORY_NAME)
 
         log_channel = discord.utils.get(
-            modmail_category.text_channels, name="message-logs")
+            modmail_category.text_channels, name=MessageLogger.LOG_CHANNEL_NAME)
         if not log_channel:
-            log_channel = await guild.create_text_channel("message-logs", category=modmail_category)
+            log_channel = await guild.create_text_channel(MessageLogger.LOG_CHANNEL_NAME, category=modmail_category)
 
+        MessageLogger.invalidate_log_channel(guild.id)
         return log_channel
 
     @staticmethod
@@ -8,41 +8,57 @@ logger = logging.getLogger(__name__)
 
 class MuteEventHelper:
     @staticmethod
-    async def handle_mute_reapplication(bot, member):
-        """Check and reapply mutes for rejoining members."""
-        user_id = str(member.id)
-        guild_id = str(member.guild.id)
-
-        query = '''
-            SELECT id, reason, duration FROM moderation 
-            WHERE user_id = %s AND guild_id = %s AND action = 'mute' 
+    async def fetch_active_mutes(guild_id, user_ids):
+        """Return {user_id: latest active timed mute} for a set of users in one query."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        placeholders = ", ".join(["%s"] * len(user_ids))
+        query = f'''
+            SELECT id, user_id, reason, duration, timestamp FROM moderation 
+            WHERE guild_id = %s AND user_id IN ({placeholders}) AND action = 'mute' 
             AND duration IS NOT NULL AND active = 1 AND quashed = 0 
-            ORDER BY timestamp DESC LIMIT 1
+            ORDER BY timestamp DESC
         '''
-        mute = await Database.fetchrow(query, user_id, guild_id)
+        rows = await Database.fetch(query, guild_id, *user_ids)
+        mutes = {}
+        for row in rows:
+            mutes.setdefault(row["user_id"], row)
+        return mutes
 
-        if not mute:
-            return
+    @staticmethod
+    async def handle_mute_reapplication(bot, member):
+        """Check and reapply mutes for a rejoining member."""
+        await MuteEventHelper.handle_mute_reapplication_bulk(member.guild, [member])
 
-        mute_id, reason, duration = mute["id"], mute["reason"], mute["duration"]
+    @staticmethod
+    async def handle_mute_reapplication_bulk(guild, members):
+        """Check and reapply mutes for a batch of members who joined the same guild."""
+        guild_id = str(guild.id)
+        mutes = await MuteEventHelper.fetch_active_mutes(guild_id, {str(m.id) for m in members})
+        if not mutes:
+            return
 
-        # Get mute start time
-        mute_start_query = "SELECT timestamp FROM moderation WHERE id = %s"
-        mute_start_row = await Database.fetchrow(mute_start_query, mute_id)
-        mute_start = datetime.fromisoformat(mute_start_row["timestamp"])
-        mute_end = mute_start + timedelta(seconds=duration)
+        mute_role = discord.utils.get(guild.roles, name="Muted")
         current_time = datetime.now(timezone.utc)
+        for member in members:
+            user_id = str(member.id)
+            mute = mutes.get(user_id)
+            if not mute:
+                continue
+
+            mute_start = datetime.fromisoformat(mute["timestamp"])
+            mute_end = mute_start + timedelta(seconds=mute["duration"])
 
-        if current_time < mute_end:
-            mute_role = discord.utils.get(member.guild.roles, name="Muted")
-            if mute_role and mute_role not in member.roles:
-                try:
-                    await member.add_roles(mute_role, reason="Re-applying mute after rejoin")
-                    logger.info(
-                        f"Re-applied 'Muted' role to {member} ({user_id}) after rejoin.")
-                except discord.Forbidden:
-                    logger.warning(
-                        f"Missing permissions to re-apply mute to {member} ({user_id}) after rejoin.")
+            if current_time < mute_end:
+                if mute_role and mute_role not in member.roles:
+                    try:
+                        await member.add_roles(mute_role, reason="Re-applying mute after rejoin")
+                        logger.info(
+                            f"Re-applied 'Muted' role to {member} ({user_id}) after rejoin.")
+                    except discord.Forbidden:
+                        logger.warning(
+                            f"Missing permissions to re-apply mute to {member} ({user_id}) after rejoin.")
 
     @staticmethod
     async def process_mute_expiration(guild, mute_id, user_id, guild_id):
@@ -2,7 +2,7 @@ import io
 import logging
 import re
 import discord
-from util.core import Database
+from util.core import Database, GuildSettings
 from util.moderation.embeds import SetupEmbed
 from typing import Union, List, Tuple
 
@@ -334,13 +334,7 @@ class WelcomeHelper:
                 return
 
             # Update the database
-            async with view.bot.db.acquire() as conn:
-                async with conn.cursor() as cur:
-                    await cur.execute(
-                        "INSERT INTO guild_settings (guild_id, `key`, value) VALUES (%s, %s, %s) AS new ON DUPLICATE KEY UPDATE value = new.value",
-                        (view.guild_id, setting_key, channel_id)
-                    )
-                    await conn.commit()
+            await GuildSettings.set_setting(setting_key, channel_id, guild_id=view.guild_id)
 
             # Update the rows data and refresh the view
             view.rows = [row for row in view.rows if row[0] != setting_key]
@@ -407,35 +401,28 @@ class WelcomeHelper:
         """Process command-line channel arguments and update database"""
         updated_settings = []
 
-        async with bot.db.acquire() as conn:
-            async with conn.cursor() as cur:
-                for key, value in settings:
-                    if value:
-                        # Accept channel mention or ID
-                        channel_id = None
-                        if value.isdigit():
-                            channel_id = value
-                        else:
-                            match = re.match(r"<#(\d+)>", value)
-                            if match:
-                                channel_id = match.group(1)
-
-                        if channel_id:
-                            await cur.execute(
-                                "INSERT INTO guild_settings (guild_id, `key`, value) VALUES (%s, %s, %s) AS new ON DUPLICATE KEY UPDATE value = new.value",
-                                (guild_id, key, channel_id)
-                            )
-                            updated_settings.append(
-                                f"• `{key}`: <#{channel_id}>")
-                            logger.info(
-                                f"Set {key} to {channel_id} in guild {guild_id}.")
-                        else:
-                            await send_func(f"❌ Invalid channel mention or ID for `{key}`. Skipping this setting.")
-                            logger.warning(
-                                f"Invalid channel '{value}' for {key} in guild {guild_id}.")
-                            continue
-
-                await conn.commit()
+        for key, value in settings:
+            if value:
+                # Accept channel mention or ID
+                channel_id = None
+                if value.isdigit():
+                    channel_id = value
+                else:
+                    match = re.match(r"<#(\d+)>", value)
+                    if match:
+                        channel_id = match.group(1)
+
+                if channel_id:
+                    await GuildSettings.set_setting(key, channel_id, guild_id=guild_id)
+                    updated_settings.append(
+                        f"• `{key}`: <#{channel_id}>")
+                    logger.info(
+                        f"Set {key} to {channel_id} in guild {guild_id}.")
+                else:
+                    await send_func(f"❌ Invalid channel mention or ID for `{key}`. Skipping this setting.")
+                    logger.warning(
+                        f"Invalid channel '{value}' for {key} in guild {guild_id}.")
+                    continue
 
         return updated_settings, len(updated_settings) > 0
 
@@ -1,5 +1,6 @@
 import discord
 from discord.ui import View, Button
+from util.core import GuildSettings
 from util.moderation.utils import TicketHelper
 import logging
 
@@ -182,13 +183,7 @@ class ChannelEditView(discord.ui.View):
             return
 
         # Clear the setting from database
-        async with self.parent_view.bot.db.acquire() as conn:
-            async with conn.cursor() as cur:
-                await cur.execute(
-                    "DELETE FROM guild_settings WHERE guild_id = %s AND `key` = %s",
-                    (self.parent_view.guild_id, self.setting_key)
-                )
-                await conn.commit()
+        await GuildSettings.delete_setting(self.setting_key, guild_id=self.parent_view.guild_id)
 
         # Log the clear action
         logger.info(
@@ -17,11 +17,11 @@ __all__ = [
     # loadouts.py
     "DebugLoadouts",
     # queries.py
-    "BlacklistQueries",
+    "BlacklistQueries", "AuditQueries",
     # stats.py
     "DebugStats",
     # utils.py
     "BlacklistUtils",
     # views.py
-    "DebugPaginator", "ReloadSelect", "ReloadView", "UnloadSelect", "UnloadView", "CogActionView"
+    "DebugPaginator", "CommandAuditPaginator", "ReloadSelect", "ReloadView", "UnloadSelect", "UnloadView", "CogActionView"
 ]
\ No newline at end of file
@@ -1,4 +1,3 @@
-import statistics
 import discord
 import sys
 import psutil
@@ -185,8 +184,7 @@ class DebugEmbeds:
         header = f"{'Commmand':<12}{'Run':>4}{'Avg':>6}{'Med':>6}{'Min':>6}{'Max':>6}"
         lines = [header, "-" * len(header)]
         for stat in stats:
-            times = stat.get("times", [])
-            median = statistics.median(times) if times else stat["avg_time"]
+            median = stat.get("median_time", stat["avg_time"])
             cmd = stat['command_name'][:12]
             lines.append(
                 f"{cmd:<12}{stat['count']:>4}{stat['avg_time']:>6.2f}{median:>6.2f}{stat['min_time']:>6.2f}{stat['max_time']:>6.2f}"
@@ -77,3 +77,39 @@ class BlacklistQueries:
         '''
         params = (active, user_id, channel_id, guild_id)
         await Database.execute(query, *params)
+
+
+class AuditQueries:
+    AUDIT_COLUMNS = "log_id, user_id, username, channel_id, channel_name, guild_id, command_name, success, error, response_time, timestamp"
+
+    @staticmethod
+    async def fetch_command_logs_page(guild_id, cursor=None, limit=10, user_id=None, command_name=None, success=None):
+        """
+        Fetch one page of command logs, newest first, starting after cursor.
+        The cursor is the (timestamp, log_id) of the last row on the previous page, so each
+        page is an index range scan on (guild_id, timestamp) rather than an OFFSET.
+        Returns up to limit + 1 rows; the extra row only signals that another page exists.
+        """
+        conditions = ["guild_id = %s"]
+        params = [str(guild_id)]
+        if cursor:
+            timestamp, log_id = cursor
+            conditions.append("(timestamp < %s OR (timestamp = %s AND log_id < %s))")
+            params.extend([timestamp, timestamp, log_id])
+        if user_id is not None:
+            conditions.append("user_id = %s")
+            params.append(str(user_id))
+        if command_name:
+            conditions.append("command_name = %s")
+            params.append(command_name)
+        if success is not None:
+            conditions.append("success = %s")
+            params.append(bool(success))
+        query = f"""
+            SELECT {AuditQueries.AUDIT_COLUMNS}
+            FROM command_logs
+            WHERE {" AND ".join(conditions)}
+            ORDER BY timestamp DESC, log_id DESC
+            LIMIT %s
+        """
+        return await Database.fetch(query, *params, limit + 1)
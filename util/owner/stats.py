@@ -1,7 +1,7 @@
 import logging
-import statistics
 from collections import defaultdict
 from typing import List, Dict, Any
+from util.core.rollup import CommandStatsRollup
 
 logger = logging.getLogger(__name__)
 
@@ -17,21 +17,21 @@ class DebugStats:
                 async with conn.cursor() as cur:
                     await cur.execute("""
                         SELECT command_name,
-                               COUNT(*) AS count,
-                               AVG(response_time) AS avg_time,
-                               MIN(response_time) AS min_time,
-                               MAX(response_time) AS max_time
-                        FROM command_logs
+                               SUM(count) AS count,
+                               SUM(sum_time) / NULLIF(SUM(timed_count), 0) AS avg_time,
+                               MIN(min_time) AS min_time,
+                               MAX(max_time) AS max_time
+                        FROM command_stats_hourly
                         GROUP BY command_name
                         ORDER BY count DESC
                     """)
                     rows = await cur.fetchall()
-                    logger.info(f"Fetched {len(rows)} rows from command_logs")
+                    logger.info(f"Fetched {len(rows)} rows from command_stats_hourly")
                     return [
                         {
                             "command_name": row[0],
-                            "count": row[1],
-                            "avg_time": row[2] or 0,
+                            "count": int(row[1]),
+                            "avg_time": float(row[2] or 0),
                             "min_time": row[3] or 0,
                             "max_time": row[4] or 0
                         }
@@ -43,39 +43,31 @@ class DebugStats:
 
     @staticmethod
     async def get_command_stats_with_times(bot) -> List[Dict[str, Any]]:
-        """Get command usage statistics including all response times for median calculation."""
+        """Get command usage statistics with median and p95 response times from the rollup histograms."""
         if not bot or not hasattr(bot, 'db'):
             logger.warning("Bot instance or database pool not found")
             return []
 
         try:
+            result = await DebugStats.get_command_stats(bot)
             async with bot.db.acquire() as conn:
                 async with conn.cursor() as cur:
                     await cur.execute("""
-                        SELECT command_name, response_time
-                        FROM command_logs
+                        SELECT command_name, bucket, SUM(count)
+                        FROM command_stats_buckets
+                        GROUP BY command_name, bucket
                     """)
                     rows = await cur.fetchall()
 
-            # Group response times by command_name
-            stats = defaultdict(list)
-            for cmd, resp_time in rows:
-                if resp_time is not None:
-                    stats[cmd].append(float(resp_time))
+            # Merge every hour's histogram per command
+            buckets = defaultdict(dict)
+            for cmd, bucket, count in rows:
+                buckets[cmd][bucket] = int(count)
 
-            result = []
-            for cmd, times in stats.items():
-                result.append({
-                    "command_name": cmd,
-                    "count": len(times),
-                    "avg_time": statistics.mean(times) if times else 0,
-                    "min_time": min(times) if times else 0,
-                    "max_time": max(times) if times else 0,
-                    "median_time": statistics.median(times) if times else 0,
-                    "times": times
-                })
-            # Sort by count descending
-            result.sort(key=lambda x: x["count"], reverse=True)
+            for stat in result:
+                histogram = buckets.get(stat["command_name"], {})
+                stat["median_time"] = CommandStatsRollup.quantile(histogram, 0.5) if histogram else stat["avg_time"]
+                stat["p95_time"] = CommandStatsRollup.quantile(histogram, 0.95) if histogram else stat["max_time"]
             return result
 
         except Exception as e:
@@ -92,12 +84,10 @@ class DebugStats:
             async with bot.db.acquire() as conn:
                 async with conn.cursor() as cur:
                     await cur.execute("""
-                        SELECT user_id, COUNT(*) AS total_runs, 
-                               AVG(response_time) AS avg_time, 
-                               MAX(response_time) AS max_time
-                        FROM command_logs
-                        WHERE user_id IS NOT NULL
-                        GROUP BY user_id
+                        SELECT user_id, count AS total_runs,
+                               sum_time / NULLIF(timed_count, 0) AS avg_time,
+                               max_time
+                        FROM command_user_stats
                         ORDER BY total_runs DESC
                         LIMIT %s
                     """, (limit,))
@@ -106,7 +96,7 @@ class DebugStats:
                 {
                     "user_id": row[0],
                     "total_runs": row[1],
-                    "avg_time": row[2] or 0,
+                    "avg_time": float(row[2] or 0),
                     "max_time": row[3] or 0
                 }
                 for row in rows
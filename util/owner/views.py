@@ -4,6 +4,8 @@ import time
 import logging
 from util.owner.embeds import DebugEmbeds
 from util.owner.helpers import DebugHelpers
+from util.owner.queries import AuditQueries
+from util.core.handoff import StateHandoff
 
 class DebugPaginator(discord.ui.View):
     """Paginator for debug command outputs"""
@@ -66,6 +68,113 @@ class DebugPaginator(discord.ui.View):
             await self.update(interaction)
             
 
+class CommandAuditPaginator(discord.ui.View):
+    """Keyset paginator for command_logs; every button press fetches exactly one page."""
+
+    def __init__(self, author_id: int, guild_id, filters: dict, per_page: int = 10):
+        super().__init__(timeout=120)
+        self.author_id = author_id
+        self.guild_id = guild_id
+        self.filters = filters
+        self.per_page = per_page
+        self.cursors = [None]  # cursor that starts each visited page; cursors[page]
+        self.page = 0
+        self.rows = []
+        self.has_more = False
+
+    async def load_page(self):
+        """Fetch the current page and update button states."""
+        rows = await AuditQueries.fetch_command_logs_page(
+            self.guild_id, cursor=self.cursors[self.page], limit=self.per_page, **self.filters
+        )
+        self.has_more = len(rows) > self.per_page
+        self.rows = rows[:self.per_page]
+        if self.has_more and len(self.cursors) == self.page + 1:
+            last = self.rows[-1]
+            self.cursors.append((last["timestamp"], last["log_id"]))
+        self.newest.disabled = self.page == 0
+        self.previous.disabled = self.page == 0
+        self.next.disabled = not self.has_more
+        return self.rows
+
+    async def update(self, interaction: discord.Interaction):
+        await self.load_page()
+        await interaction.response.edit_message(content=self.format_page(self.rows, self.page), view=self)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("You can't use this paginator.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="⏮️ Newest", style=discord.ButtonStyle.secondary)
+    async def newest(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = 0
+        await self.update(interaction)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page > 0:
+            self.page -= 1
+        await self.update(interaction)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.has_more:
+            self.page += 1
+        await self.update(interaction)
+
+    @staticmethod
+    def format_timestamp(timestamp):
+        """Format a command_logs timestamp as HH:MM:SS DD/MM/YYYY in PST."""
+        if not timestamp:
+            return "N/A"
+        try:
+            from datetime import datetime
+            import pytz
+
+            if isinstance(timestamp, datetime):
+                dt = timestamp
+            else:
+                dt = datetime.fromisoformat(str(timestamp))
+            pst_tz = pytz.timezone('America/Los_Angeles')
+            return dt.astimezone(pst_tz).strftime("%H:%M:%S %d/%m/%Y")
+        except Exception:
+            return "N/A"
+
+    @staticmethod
+    def format_page(rows, page):
+        if not rows:
+            return f"**Command Audit Log (Page {page+1})**\nNo data found."
+
+        header = ["Username", "Channel", "Command", "Date/Time", "Log ID"]
+        lines = [f"**Command Audit Log (Page {page+1})**", "```"]
+        header_line = "  ".join(f"{col:<15}" for col in header)
+        lines.append(header_line)
+        lines.append("-" * len(header_line))
+
+        for entry in rows:
+            success_emoji = "✅" if entry.get('success') else "❌"
+            username = f"{success_emoji} {str(entry.get('username') or '')[:12]}"
+            channel_name = str(entry.get('channel_name') or '')[:15]
+
+            response_time_val = entry.get('response_time')
+            response_time_str = f"[{response_time_val:.2f}s]" if response_time_val is not None else "[N/A]"
+            command_with_time = f"{entry.get('command_name') or ''} {response_time_str}"
+
+            time_str = CommandAuditPaginator.format_timestamp(entry.get('timestamp'))
+
+            # Last 6 characters of log_id, which /audit <id> accepts
+            log_id = str(entry.get('log_id') or '')
+            log_id_short = log_id[-6:]
+
+            row_data = [username, channel_name, command_with_time, time_str, log_id_short]
+            lines.append("  ".join(f"{col:<15}" for col in row_data))
+
+        lines.append("```")
+        return "\n".join(lines)
+
+
 class ReloadSelect(discord.ui.Select):
     def __init__(self, bot, all_cogs):
         options = [
@@ -91,7 +200,7 @@ class ReloadSelect(discord.ui.Select):
             for cog_name in self.all_cogs:
                 try:
                     if cog_name in self.bot.extensions:
-                        await self.bot.reload_extension(cog_name)
+                        await StateHandoff.hot_reload(self.bot, cog_name)
                     else:
                         await self.bot.load_extension(cog_name)
                 except Exception as e:
@@ -113,9 +222,11 @@ class ReloadSelect(discord.ui.Select):
                 )
         else:
             start = time.perf_counter()
+            handed_off = []
             try:
                 if cog in self.bot.extensions:
-                    await self.bot.reload_extension(cog)
+                    # Cogs that stash state in cog_unload (e.g. music queues) pick it back up
+                    handed_off = await StateHandoff.hot_reload(self.bot, cog)
                 else:
                     await self.bot.load_extension(cog)
                 elapsed = (time.perf_counter() - start) * 1000
@@ -125,7 +236,7 @@ class ReloadSelect(discord.ui.Select):
                     self.bot, self.all_cogs)
                 await message.edit(embed=new_embed, view=CogActionView(self.bot, DebugHelpers.find_cog_extensions()))
                 await interaction.response.send_message(
-                    f"✅ Reloaded `{cog}` in {elapsed:.2f}ms.",
+                    f"✅ Reloaded `{cog}` in {elapsed:.2f}ms." + (f" Kept state: {', '.join(handed_off)}." if handed_off else ""),
                     ephemeral=True
                 )
             except Exception as e:
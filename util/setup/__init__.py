@@ -1,5 +1,5 @@
 from .events import *
 
 __all__ = [
-    "WelcomeHandler"
+    "HighlightIndex", "WelcomeHandler", "MemberJoinPipeline"
 ]
@@ -1,10 +1,120 @@
+import asyncio
+import time
 import discord
 import random
 import logging
-from util.core.database import Database
+from collections import defaultdict, deque
+from util.core import DiscordHelper, GuildSettings
+from util.community import SyncNewMember
+from util.moderation import MuteEventHelper
 
 logger = logging.getLogger(__name__)
 
+class HighlightIndex:
+    """Per-guild pool of highlight clips, built once from history and kept current from events."""
+    HISTORY_LIMIT = 100
+    RETRY_AFTER = 5 * 60  # seconds before a failed history fetch is tried again
+
+    _clips = {}  # guild_id: [(message_id, url, author)]
+    _positions = {}  # guild_id: {(message_id, url): index into _clips}
+    _message_urls = {}  # guild_id: {message_id: [url]}, so deletes don't scan the pool
+    _channel_ids = {}  # guild_id: highlights channel the pool was built from
+    _retry_at = {}  # guild_id: monotonic time a failed build may be retried
+    _locks = {}  # guild_id: asyncio.Lock
+
+    @staticmethod
+    def video_attachments(message):
+        return [
+            att for att in message.attachments
+            if att.content_type and att.content_type.startswith("video/")
+        ]
+
+    @classmethod
+    def is_indexed(cls, guild_id, channel_id):
+        return cls._channel_ids.get(guild_id) == channel_id
+
+    @classmethod
+    async def ensure_built(cls, highlights_channel):
+        """
+        Build the guild's pool from channel history unless it is already built for
+        this channel. A failed fetch is not retried until RETRY_AFTER has passed.
+        """
+        guild_id = highlights_channel.guild.id
+        if cls.is_indexed(guild_id, highlights_channel.id):
+            return
+        if cls._retry_at.get(guild_id, 0) > time.monotonic():
+            return
+        lock = cls._locks.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            if cls.is_indexed(guild_id, highlights_channel.id) or cls._retry_at.get(guild_id, 0) > time.monotonic():
+                return
+            cls._clips[guild_id] = []
+            cls._positions[guild_id] = {}
+            cls._message_urls[guild_id] = {}
+            try:
+                async for message in highlights_channel.history(limit=cls.HISTORY_LIMIT):
+                    cls._add(guild_id, message)
+            except Exception:
+                cls.invalidate(guild_id)
+                cls._retry_at[guild_id] = time.monotonic() + cls.RETRY_AFTER
+                raise
+            cls._retry_at.pop(guild_id, None)
+            cls._channel_ids[guild_id] = highlights_channel.id
+            logger.info(
+                f"Indexed {len(cls._clips[guild_id])} highlight clip(s) for guild {guild_id}")
+
+    @classmethod
+    def _add(cls, guild_id, message):
+        clips = cls._clips.setdefault(guild_id, [])
+        positions = cls._positions.setdefault(guild_id, {})
+        message_urls = cls._message_urls.setdefault(guild_id, {})
+        for att in cls.video_attachments(message):
+            key = (message.id, att.url)
+            if key in positions:
+                continue
+            positions[key] = len(clips)
+            clips.append((message.id, att.url, message.author.display_name))
+            message_urls.setdefault(message.id, []).append(att.url)
+
+    @classmethod
+    def add_message(cls, message):
+        """Index a new message posted in an already-indexed highlights channel."""
+        if message.guild and cls.is_indexed(message.guild.id, message.channel.id):
+            cls._add(message.guild.id, message)
+
+    @classmethod
+    def remove_message(cls, guild_id, message_id):
+        """Drop every clip from a deleted message (swap-remove, O(1) per clip)."""
+        clips = cls._clips.get(guild_id)
+        positions = cls._positions.get(guild_id)
+        urls = cls._message_urls.get(guild_id, {}).pop(message_id, None)
+        if not clips or not urls:
+            return
+        for url in urls:
+            index = positions.pop((message_id, url))
+            last = clips.pop()
+            if index < len(clips):
+                clips[index] = last
+                positions[(last[0], last[1])] = index
+
+    @classmethod
+    def invalidate(cls, guild_id):
+        cls._clips.pop(guild_id, None)
+        cls._positions.pop(guild_id, None)
+        cls._message_urls.pop(guild_id, None)
+        cls._channel_ids.pop(guild_id, None)
+        cls._retry_at.pop(guild_id, None)
+
+    @classmethod
+    def pick(cls, guild_id):
+        """Return (url, author) for a random clip, or None if the pool is empty."""
+        clips = cls._clips.get(guild_id)
+        if not clips:
+            return None
+        _, url, author = random.choice(clips)
+        return url, author
+
+
 class WelcomeHandler:
     def __init__(self, bot):
         self.bot = bot
@@ -13,26 +123,13 @@ class WelcomeHandler:
     async def get_random_highlight_video(highlights_channel):
         """Get a random highlight video from the highlights channel."""
         try:
-            messages = [message async for message in highlights_channel.history(limit=100)]
-            video_messages = [
-                msg for msg in messages
-                if any(att.content_type and att.content_type.startswith("video/") for att in msg.attachments)
-            ]
-
-            if video_messages:
-                random_video_message = random.choice(video_messages)
-                video_attachments = [
-                    att for att in random_video_message.attachments
-                    if att.content_type and att.content_type.startswith("video/")
-                ]
-
-                if video_attachments:
-                    random_video_attachment = random.choice(video_attachments)
-                    video_url = random_video_attachment.url
-                    clip_author = random_video_message.author.display_name
-                    logger.info(
-                        f"Selected random highlight video for welcome: {video_url} by {clip_author}")
-                    return video_url, clip_author
+            await HighlightIndex.ensure_built(highlights_channel)
+            clip = HighlightIndex.pick(highlights_channel.guild.id)
+            if clip:
+                video_url, clip_author = clip
+                logger.info(
+                    f"Selected random highlight video for welcome: {video_url} by {clip_author}")
+                return video_url, clip_author
 
         except discord.Forbidden:
             logger.warning(
@@ -47,8 +144,9 @@ class WelcomeHandler:
     async def send_welcome_message(self, member: discord.Member):
         """Send welcome message with random highlight video."""
         guild_id = str(member.guild.id)
+        settings = await GuildSettings.get_settings(guild_id)
 
-        welcome_channel_id = await GuildSettings.get_setting('welcome_channel_id', guild_id=guild_id)
+        welcome_channel_id = settings.get('welcome_channel_id')
         if not welcome_channel_id:
             logger.info(
                 "Welcome channel ID not set. Skipping welcome message.")
@@ -61,11 +159,11 @@ class WelcomeHandler:
             return
 
         # Get channel tags
-        squad_channel_id = await GuildSettings.get_setting('squad_channel_id', guild_id=guild_id)
+        squad_channel_id = settings.get('squad_channel_id')
         squad_channel_tag = f"<#{squad_channel_id}>" if squad_channel_id and self.bot.get_channel(
             int(squad_channel_id)) else "the squad channel"
 
-        highlights_channel_id = await GuildSettings.get_setting('highlights_channel_id', guild_id=guild_id)
+        highlights_channel_id = settings.get('highlights_channel_id')
         highlights_channel = self.bot.get_channel(
             int(highlights_channel_id)) if highlights_channel_id else None
         highlights_channel_tag = f"<#{highlights_channel_id}>" if highlights_channel else "the highlights channel"
@@ -94,3 +192,72 @@ class WelcomeHandler:
             logger.error(f"HTTPException while sending welcome message: {e}")
         except Exception as e:
             logger.exception("Unexpected error sending welcome message.")
+
+
+class MemberJoinPipeline:
+    """
+    Runs the member-join steps concurrently and, during join bursts,
+    coalesces joins per guild so the DB work is done once per batch.
+    """
+    # Above BURST_THRESHOLD joins per BURST_WINDOW seconds, joins wait COALESCE_DELAY to be batched
+    BURST_THRESHOLD = 3
+    BURST_WINDOW = 5
+    COALESCE_DELAY = 2
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._recent_joins = defaultdict(deque)  # guild_id: join timestamps
+        self._pending = defaultdict(list)  # guild_id: [members]
+        self._flush_tasks = {}  # guild_id: asyncio.Task
+        self._tasks = set()  # every running join task, so none is garbage-collected mid-run
+
+    def _is_burst(self, guild_id):
+        now = time.monotonic()
+        joins = self._recent_joins[guild_id]
+        joins.append(now)
+        while joins and now - joins[0] > self.BURST_WINDOW:
+            joins.popleft()
+        return len(joins) > self.BURST_THRESHOLD
+
+    def _spawn(self, coro):
+        """Start a task, holding a reference until it finishes and logging it if it fails."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Member join task failed: {task.exception()}", exc_info=task.exception())
+
+    def submit(self, member):
+        """Queue a joining member; returns immediately."""
+        guild = member.guild
+        if not self._is_burst(guild.id) and guild.id not in self._flush_tasks:
+            self._spawn(self.process(guild, [member]))
+            return
+        self._pending[guild.id].append(member)
+        if guild.id not in self._flush_tasks:
+            self._flush_tasks[guild.id] = self._spawn(self._flush_later(guild))
+
+    async def _flush_later(self, guild):
+        await asyncio.sleep(self.COALESCE_DELAY)
+        self._flush_tasks.pop(guild.id, None)
+        members = self._pending.pop(guild.id, [])
+        if members:
+            logger.info(f"Processing {len(members)} coalesced join(s) in guild {guild.id}")
+            await self.process(guild, members)
+
+    async def process(self, guild, members):
+        """Run mute re-application, loadout sync and welcome messages for a batch concurrently."""
+        welcome = WelcomeHandler(self.bot)
+        results = await asyncio.gather(
+            MuteEventHelper.handle_mute_reapplication_bulk(guild, members),
+            SyncNewMember.sync_community_loadouts_bulk(guild, members),
+            *(welcome.send_welcome_message(member) for member in members),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error in member join pipeline for guild {guild.id}: {result}", exc_info=result)
@@ -1,10 +1,12 @@
 from .cache import *
 from .download import *
 from .formatter import *
+from .metadata import *
 from .permissions import *
 from .playback import *
 from .state import *
 from .validation import *
+from .worker import *
 
 __all__ = [
     # cache.py
@@ -13,12 +15,16 @@ __all__ = [
     "MusicDownloader",
     # formatter.py
     "Formatter",
+    # metadata.py
+    "MusicMetadataCache",
     # permissions.py
     "Permissions",
     # playback.py
     "MusicPlayback",
     # state.py
-    "MusicState",
+    "Track", "GuildMusicState",
     # validation.py
-    "MusicValidation"
+    "MusicValidation",
+    # worker.py
+    "MusicQueueWorker"
 ]
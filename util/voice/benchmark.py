@@ -0,0 +1,252 @@
+"""
+Offline benchmark for the music pipeline.
+
+Serves generated fixture audio from a local HTTP server in place of YouTube
+(yt-dlp resolves it through its generic extractor), drives MusicCog's queue
+workers against stub voice clients and reports per-stage latency.
+
+    python -m util.voice.benchmark --guilds 10 --tracks 5 --duration 3
+"""
+import os
+import sys
+import math
+import time
+import wave
+import struct
+import asyncio
+import argparse
+import resource
+import tempfile
+import threading
+import statistics
+import functools
+from types import SimpleNamespace
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from util.voice.cache import MusicCacheManager
+from util.voice.download import MusicDownloader
+from util.voice.metadata import MusicMetadataCache
+from util.voice.state import Track
+
+SAMPLE_RATE = 48000
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class StubVoiceClient:
+    """
+    Stands in for discord.VoiceClient. Reads the Opus packets FFmpeg produces,
+    optionally paced at 20ms per packet like the real player, and records when
+    audio starts and stops.
+    """
+    def __init__(self, recorder, guild_id, realtime=False):
+        self.recorder = recorder
+        self.guild_id = guild_id
+        self.realtime = realtime
+        self.channel = SimpleNamespace(members=[])
+        self._connected = True
+        self._playing = False
+        self._stop = threading.Event()
+
+    def is_connected(self):
+        return self._connected
+
+    def is_playing(self):
+        return self._playing
+
+    def play(self, source, *, after=None):
+        self._playing = True
+        self._stop.clear()
+        threading.Thread(target=self._drain, args=(source, after, time.perf_counter()), daemon=True).start()
+
+    def _drain(self, source, after, started):
+        error = None
+        first = None
+        try:
+            while not self._stop.is_set():
+                packet = source.read()
+                if not packet:
+                    break
+                if first is None:
+                    first = time.perf_counter()
+                    self.recorder.audio_started(self.guild_id, started, first)
+                if self.realtime:
+                    time.sleep(0.02)
+        except Exception as e:
+            error = e
+        finally:
+            source.cleanup()
+            self._playing = False
+            self.recorder.audio_stopped(self.guild_id, time.perf_counter())
+            if after:
+                after(error)
+
+    def stop(self):
+        self._stop.set()
+
+    async def disconnect(self, *, force=False):
+        self.stop()
+        self._connected = False
+
+
+class StageRecorder:
+    def __init__(self):
+        self.samples = {"resolve": [], "download": [], "ffmpeg_start": [], "transition_gap": [], "time_to_first_audio": []}
+        self.enqueued_at = {}
+        self.last_stop = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    def audio_started(self, guild_id, play_called, first_packet):
+        self.add("ffmpeg_start", first_packet - play_called)
+        with self._lock:
+            last_stop = self.last_stop.get(guild_id)
+        if last_stop is None:
+            self.add("time_to_first_audio", first_packet - self.enqueued_at[guild_id])
+        else:
+            self.add("transition_gap", first_packet - last_stop)
+
+    def audio_stopped(self, guild_id, when):
+        with self._lock:
+            self.last_stop[guild_id] = when
+
+    def timed(self, stage, func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return staticmethod(wrapper)
+
+    def report(self):
+        lines = [f"{'stage':<20} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+        for stage, values in self.samples.items():
+            if not values:
+                lines.append(f"{stage:<20} {0:>5} {'-':>9} {'-':>9} {'-':>9}")
+                continue
+            ordered = sorted(values)
+            p95 = ordered[min(len(ordered) - 1, math.ceil(len(ordered) * 0.95) - 1)]
+            lines.append(f"{stage:<20} {len(ordered):>5} {statistics.median(ordered) * 1000:>9.1f} "
+                         f"{p95 * 1000:>9.1f} {ordered[-1] * 1000:>9.1f}")
+        return "\n".join(lines)
+
+
+def write_fixture(path, seconds, frequency):
+    """Write a stereo 48kHz sine-wave WAV file."""
+    frames = bytearray()
+    for i in range(int(SAMPLE_RATE * seconds)):
+        sample = int(12000 * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE))
+        frames += struct.pack("<hh", sample, sample)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(bytes(frames))
+
+
+def start_server(directory):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_benchmark(guilds, tracks, duration, realtime=False, prefetch_to_disk=True, timeout=300):
+    # Imported here so the cog module isn't loaded just to parse --help
+    from cogs.Voice.MusicCog import MusicCog
+    from util.voice.worker import MusicQueueWorker
+
+    workdir = tempfile.mkdtemp(prefix="music-bench-")
+    fixtures = os.path.join(workdir, "fixtures")
+    os.makedirs(fixtures)
+    for i in range(tracks):
+        write_fixture(os.path.join(fixtures, f"track{i}.wav"), duration, 220 + 20 * i)
+    server = start_server(fixtures)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    recorder = StageRecorder()
+    saved = {
+        (MusicCacheManager, "MUSIC_CACHE_DIR"): MusicCacheManager.MUSIC_CACHE_DIR,
+        (MusicCacheManager, "INDEX_FILE"): MusicCacheManager.INDEX_FILE,
+        (MusicMetadataCache, "METADATA_FILE"): MusicMetadataCache.METADATA_FILE,
+        (MusicQueueWorker, "PREFETCH_TO_DISK"): MusicQueueWorker.PREFETCH_TO_DISK,
+        (MusicDownloader, "resolve_stream"): MusicDownloader.__dict__["resolve_stream"],
+        (MusicDownloader, "download_youtube"): MusicDownloader.__dict__["download_youtube"],
+    }
+    # Keep the real caches untouched and time the yt-dlp stages
+    MusicCacheManager.MUSIC_CACHE_DIR = os.path.join(workdir, "music_cache")
+    MusicCacheManager.INDEX_FILE = os.path.join(MusicCacheManager.MUSIC_CACHE_DIR, "index.json")
+    MusicMetadataCache.METADATA_FILE = os.path.join(workdir, "music_metadata.json")
+    MusicQueueWorker.PREFETCH_TO_DISK = prefetch_to_disk
+    MusicDownloader.resolve_stream = recorder.timed("resolve", MusicDownloader.resolve_stream)
+    MusicDownloader.download_youtube = recorder.timed("download", MusicDownloader.download_youtube)
+    MusicCacheManager.load_index()
+    MusicMetadataCache.load()
+
+    cpu_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+    cog = MusicCog(SimpleNamespace(loop=asyncio.get_running_loop()))
+    try:
+        for guild_id in range(guilds):
+            state = cog.get_guild_state(guild_id)
+            state.voice_client = StubVoiceClient(recorder, guild_id, realtime=realtime)
+            recorder.enqueued_at[guild_id] = time.perf_counter()
+            state.enqueue_many([Track(f"{base_url}/track{i}.wav", "benchmark") for i in range(tracks)])
+            state.worker.schedule_prefetch()
+            state.worker.start()
+
+        # A worker goes idle between popping its last track and playing it, so count audio starts too
+        expected = guilds * tracks
+        deadline = started + timeout
+        while len(recorder.samples["ffmpeg_start"]) < expected or any(
+                not state.is_idle() for state in cog.guild_states.values()):
+            if time.perf_counter() > deadline:
+                timed_out = True
+                break
+            await asyncio.sleep(0.05)
+        else:
+            timed_out = False
+    finally:
+        for guild_id in list(cog.guild_states):
+            await cog.release_state(guild_id)
+        server.shutdown()
+        for (owner, name), value in saved.items():
+            setattr(owner, name, value)
+        MusicDownloader.shutdown()
+
+    elapsed = time.perf_counter() - started
+    cpu_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    ffmpeg_cpu = (cpu_after.ru_utime + cpu_after.ru_stime) - (cpu_before.ru_utime + cpu_before.ru_stime)
+    return "\n".join([
+        recorder.report(),
+        "",
+        f"guilds={guilds} tracks/guild={tracks} track_length={duration}s realtime={realtime} prefetch_to_disk={prefetch_to_disk}",
+        f"wall time: {elapsed:.2f}s, child CPU: {ffmpeg_cpu:.2f}s ({ffmpeg_cpu / max(1, guilds * tracks) * 1000:.1f} ms per stream)",
+        f"work dir: {workdir}",
+    ] + ([f"timed out after {timeout}s with {len(recorder.samples['ffmpeg_start'])}/{expected} tracks started"] if timed_out else [])
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the music pipeline against local fixture audio.")
+    parser.add_argument("--guilds", type=int, default=5)
+    parser.add_argument("--tracks", type=int, default=3, help="tracks queued per guild")
+    parser.add_argument("--duration", type=float, default=3.0, help="fixture length in seconds")
+    parser.add_argument("--realtime", action="store_true", help="pace playback at 20ms per packet")
+    parser.add_argument("--no-prefetch-to-disk", action="store_true", help="stream every track instead of caching")
+    parser.add_argument("--timeout", type=float, default=300, help="give up after this many seconds")
+    args = parser.parse_args(argv)
+    print(asyncio.run(run_benchmark(
+        args.guilds, args.tracks, args.duration,
+        realtime=args.realtime, prefetch_to_disk=not args.no_prefetch_to_disk, timeout=args.timeout
+    )))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,51 +1,175 @@
 import os
+import json
+import time
 import logging
+from collections import OrderedDict
 from util.core import SizeUtils
 
 logger = logging.getLogger(__name__)
 
 class MusicCacheManager:
+    """
+    Shared on-disk audio cache keyed by (video_id, format).
+    Entries are kept in LRU order under a byte budget; files held by an active
+    playback are refcounted and never evicted. The index is persisted so the
+    cache survives restarts.
+    """
     MUSIC_CACHE_DIR = os.path.join(os.path.dirname(__file__), "music_cache")
+    INDEX_FILE = os.path.join(MUSIC_CACHE_DIR, "index.json")
+    MAX_CACHE_BYTES = 2 * 1024 ** 3
+
+    _index = OrderedDict()  # "video_id.ext": {"video_id", "format", "path", "size", "last_used"}, oldest first
+    _refcounts = {}  # path: active playbacks
+
+    @staticmethod
+    def cache_key(video_id, fmt):
+        return f"{video_id}.{fmt}"
 
     @classmethod
-    def get_music_cache_path(cls, guild_id, video_id, ext):
+    def get_music_cache_path(cls, video_id, ext):
         """Get the file path for cached music."""
-        return os.path.join(cls.MUSIC_CACHE_DIR, f"song_{guild_id}_{video_id}.{ext}")
+        return os.path.join(cls.MUSIC_CACHE_DIR, f"{video_id}.{ext}")
 
     @classmethod
-    def clear_music_cache(cls):
-        """Delete all files in the music_cache directory."""
-        removed = 0
-        total_size = 0
+    def outtmpl(cls):
+        """yt-dlp output template that writes straight into the cache."""
+        return os.path.join(cls.MUSIC_CACHE_DIR, "%(id)s.%(ext)s")
 
-        if os.path.exists(cls.MUSIC_CACHE_DIR):
-            for f in os.listdir(cls.MUSIC_CACHE_DIR):
-                file_path = os.path.join(cls.MUSIC_CACHE_DIR, f)
-                try:
-                    if os.path.isfile(file_path):
-                        total_size += os.path.getsize(file_path)
-                        os.remove(file_path)
-                        removed += 1
-                except Exception as e:
-                    logger.warning(f"Failed to remove {file_path}: {e}")
-        else:
-            os.makedirs(cls.MUSIC_CACHE_DIR, exist_ok=True)
+    @classmethod
+    def total_size(cls):
+        return sum(entry["size"] for entry in cls._index.values())
 
-        return f"✅ Music cache cleared. Files removed: {removed}, Total size freed: {SizeUtils.format_size(total_size)}"
+    @classmethod
+    def lookup(cls, video_id, fmt=None):
+        """Return the cached file for a video (any format unless one is given) and mark it recently used."""
+        for key, entry in cls._index.items():
+            if entry["video_id"] == video_id and (fmt is None or entry["format"] == fmt):
+                if not os.path.exists(entry["path"]):
+                    cls._index.pop(key)
+                    return None
+                entry["last_used"] = time.time()
+                cls._index.move_to_end(key)
+                return entry["path"]
+        return None
 
-    @staticmethod
-    def decrement_cache(download_cache, cache_refcounts, cache_locks, filename):
-        """Decrement cache reference count and cleanup if needed."""
-        refcount = cache_refcounts.get(filename, 0)
+    @classmethod
+    def register(cls, video_id, path):
+        """Add a freshly downloaded file to the cache, then evict down to the budget."""
+        fmt = os.path.splitext(path)[1].lstrip(".")
+        key = cls.cache_key(video_id, fmt)
+        cls._index[key] = {
+            "video_id": video_id,
+            "format": fmt,
+            "path": path,
+            "size": os.path.getsize(path),
+            "last_used": time.time(),
+        }
+        cls._index.move_to_end(key)
+        cls.evict()
+        cls.save_index()
+
+    @classmethod
+    def acquire(cls, path):
+        """Pin a cached file for the duration of a playback."""
+        cls._refcounts[path] = cls._refcounts.get(path, 0) + 1
+
+    @classmethod
+    def release(cls, path):
+        """Unpin a cached file; it becomes evictable once no playback holds it."""
+        refcount = cls._refcounts.get(path, 0)
         if refcount > 1:
-            cache_refcounts[filename] = refcount - 1
+            cls._refcounts[path] = refcount - 1
         else:
-            cache_refcounts.pop(filename, None)
-            for url, (info, fname) in list(download_cache.items()):
-                if fname == filename:
-                    download_cache.pop(url)
-                    cache_locks.pop(url, None)
+            cls._refcounts.pop(path, None)
+            cls.evict()
+
+    @classmethod
+    def evict(cls):
+        """Drop least recently used, unpinned files until the cache fits the byte budget."""
+        removed = 0
+        total = cls.total_size()
+        for key in list(cls._index):
+            if total <= cls.MAX_CACHE_BYTES:
+                break
+            entry = cls._index[key]
+            if cls._refcounts.get(entry["path"]):
+                continue
+            try:
+                os.remove(entry["path"])
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to evict {entry['path']}: {e}")
+                continue
+            cls._index.pop(key)
+            total -= entry["size"]
+            removed += 1
+        return removed
+
+    @classmethod
+    def save_index(cls):
+        os.makedirs(cls.MUSIC_CACHE_DIR, exist_ok=True)
+        tmp_file = cls.INDEX_FILE + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(list(cls._index.values()), f)
+        os.replace(tmp_file, cls.INDEX_FILE)
+
+    @classmethod
+    def load_index(cls):
+        """
+        Load the persisted index at startup. Entries whose files are gone are
+        dropped, files the index does not know about (e.g. partial downloads) are
+        deleted, and the cache is evicted down to the budget.
+        """
+        os.makedirs(cls.MUSIC_CACHE_DIR, exist_ok=True)
+        entries = []
+        if os.path.exists(cls.INDEX_FILE):
+            try:
+                with open(cls.INDEX_FILE, "r") as f:
+                    entries = json.load(f)
+            except Exception as e:
+                logger.warning(f"Failed to read music cache index, starting empty: {e}")
+
+        cls._index = OrderedDict()
+        for entry in sorted(entries, key=lambda e: e.get("last_used", 0)):
+            if os.path.isfile(entry.get("path", "")):
+                cls._index[cls.cache_key(entry["video_id"], entry["format"])] = entry
+
+        known = {entry["path"] for entry in cls._index.values()}
+        orphans = 0
+        for f in os.listdir(cls.MUSIC_CACHE_DIR):
+            file_path = os.path.join(cls.MUSIC_CACHE_DIR, f)
+            if file_path == cls.INDEX_FILE or file_path in known or not os.path.isfile(file_path):
+                continue
             try:
-                os.remove(filename)
-            except Exception:
-                pass
\ No newline at end of file
+                os.remove(file_path)
+                orphans += 1
+            except Exception as e:
+                logger.warning(f"Failed to remove {file_path}: {e}")
+
+        evicted = cls.evict()
+        cls.save_index()
+        return (f"✅ Music cache loaded. Files: {len(cls._index)}, Size: {SizeUtils.format_size(cls.total_size())}, "
+                f"Orphans removed: {orphans}, Evicted: {evicted}")
+
+    @classmethod
+    def clear_music_cache(cls):
+        """Delete every unpinned file in the music cache."""
+        removed = 0
+        total_size = 0
+        for key, entry in list(cls._index.items()):
+            if cls._refcounts.get(entry["path"]):
+                continue
+            try:
+                os.remove(entry["path"])
+                total_size += entry["size"]
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to remove {entry['path']}: {e}")
+                continue
+            cls._index.pop(key)
+        cls.save_index()
+
+        return f"✅ Music cache cleared. Files removed: {removed}, Total size freed: {SizeUtils.format_size(total_size)}"
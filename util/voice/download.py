@@ -1,28 +1,112 @@
 import asyncio
-import yt_dlp
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 class MusicDownloader:
+    # Prefer Opus so playback can pass it through to Discord without re-encoding
+    AUDIO_FORMAT = 'bestaudio[acodec=opus][abr<=128]/bestaudio[acodec=opus]/bestaudio[abr<=128]/bestaudio/best'
+
+    # yt-dlp holds the GIL for long stretches, so it runs in small process pools.
+    # Resolves and disk-cache downloads get separate pools (and per-guild caps), so
+    # long background downloads never queue ahead of a /play resolve.
+    MAX_WORKERS = 2  # resolves
+    DOWNLOAD_WORKERS = 1
+    GUILD_CONCURRENCY = 2
+    RESOLVE_TIMEOUT = 30
+    DOWNLOAD_TIMEOUT = 300
+    SOCKET_TIMEOUT = 15
+    MAX_PLAYLIST_ENTRIES = 100
+
+    _executors = {}  # "resolve" or "download": ProcessPoolExecutor
+    _guild_semaphores = {}  # (pool, guild_id): asyncio.Semaphore
+
     @staticmethod
-    async def download_youtube(url: str, outtmpl: str):
-        ydl_opts = {
-            'format': 'bestaudio[abr<=128]/bestaudio/best',
+    def _base_opts():
+        return {
+            'format': MusicDownloader.AUDIO_FORMAT,
             'quiet': True,
-            'outtmpl': outtmpl,
             'noplaylist': True,
             'cachedir': False,
             'no_color': True,
+            # Bounds stalled network reads inside the worker process, where cancellation can't reach
+            'socket_timeout': MusicDownloader.SOCKET_TIMEOUT,
         }
-        loop = asyncio.get_running_loop()
-        info, filename = await loop.run_in_executor(
-            None,
-            lambda: MusicDownloader._yt_dlp_download(ydl_opts, url)
-        )
+
+    @classmethod
+    def get_executor(cls, pool="resolve"):
+        if pool not in cls._executors:
+            # Spawn, not fork: forking a process with running threads (asyncio, aiomysql, log shipping) can deadlock
+            cls._executors[pool] = ProcessPoolExecutor(
+                max_workers=cls.DOWNLOAD_WORKERS if pool == "download" else cls.MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"))
+        return cls._executors[pool]
+
+    @classmethod
+    def shutdown(cls):
+        """Stop the worker processes, dropping any jobs that have not started."""
+        for executor in cls._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        cls._executors.clear()
+
+    @classmethod
+    async def _run(cls, func, ydl_opts, url, guild_id, timeout, pool="resolve"):
+        """
+        Run a yt-dlp job in the given process pool, at most GUILD_CONCURRENCY at a time
+        per guild and pool. Cancelling or timing out drops a queued job; a running one
+        is abandoned and left to finish within the socket timeout.
+        """
+        semaphore = cls._guild_semaphores.setdefault((pool, guild_id), asyncio.Semaphore(cls.GUILD_CONCURRENCY))
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(cls.get_executor(pool), func, ydl_opts, url)
+            return await asyncio.wait_for(future, timeout=timeout)
+
+    @staticmethod
+    async def resolve_stream(url: str, guild_id=None):
+        """Resolve metadata and the direct audio URL (info['url']) without downloading."""
+        ydl_opts = MusicDownloader._base_opts()
+        return await MusicDownloader._run(
+            MusicDownloader._yt_dlp_extract, ydl_opts, url, guild_id, MusicDownloader.RESOLVE_TIMEOUT)
+
+    @staticmethod
+    async def resolve_playlist(url: str, guild_id=None):
+        """
+        Flat-extract a playlist in one call. Returns entries with id, url, title and
+        duration but no audio URL; those are resolved per track just in time.
+        """
+        ydl_opts = MusicDownloader._base_opts()
+        ydl_opts.update({
+            'noplaylist': False,
+            'extract_flat': 'in_playlist',
+            'playlistend': MusicDownloader.MAX_PLAYLIST_ENTRIES,
+        })
+        info = await MusicDownloader._run(
+            MusicDownloader._yt_dlp_extract, ydl_opts, url, guild_id, MusicDownloader.RESOLVE_TIMEOUT)
+        return [entry for entry in info.get('entries') or [] if entry and entry.get('url')]
+
+    @staticmethod
+    async def download_youtube(url: str, outtmpl: str, guild_id=None):
+        ydl_opts = MusicDownloader._base_opts()
+        ydl_opts['outtmpl'] = outtmpl
+        info, filename = await MusicDownloader._run(
+            MusicDownloader._yt_dlp_download, ydl_opts, url, guild_id, MusicDownloader.DOWNLOAD_TIMEOUT, pool="download")
         return info, filename
 
+    # The functions below run inside the worker processes and must stay picklable.
+    # yt_dlp is imported there, so the bot process itself never loads it.
+
+    @staticmethod
+    def _yt_dlp_extract(ydl_opts, url):
+        import yt_dlp
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            return ydl.sanitize_info(ydl.extract_info(url, download=False))
+
     @staticmethod
     def _yt_dlp_download(ydl_opts, url):
+        import yt_dlp
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             info = ydl.extract_info(url, download=True)
             filename = ydl.prepare_filename(info)
+            info = ydl.sanitize_info(info)
         return info, filename
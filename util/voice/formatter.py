@@ -4,7 +4,7 @@ from util.core.utils import TimeUtils
 
 class Formatter:
     @staticmethod
-    def format_queue(now_playing, now_playing_start, queue, download_cache):
+    def format_queue(now_playing, now_playing_start, queue):
         display_queue = []
         if now_playing:
             if now_playing_start:
@@ -23,8 +23,8 @@ class Formatter:
                 display_queue.append(f"1. {title} ({time_str}) (queued by {queued_by})")
             else:
                 display_queue.append(f"1. {title} (queued by {queued_by})")
-        for i, item in enumerate(queue):
-            cache_entry = download_cache.get(item.get('url'))
-            title = cache_entry[0].get('title', "Fetching...") if cache_entry and cache_entry[0] else "Fetching..."
-            display_queue.append(f"{i+2}. {title} (queued by {item.get('queued_by', 'Unknown')})")
+        offset = 2 if now_playing else 1  # matches GuildMusicState.queue_offset
+        for i, track in enumerate(queue):
+            # Track.title falls back to the metadata cache for tracks not yet resolved
+            display_queue.append(f"{i+offset}. {track.title} (queued by {track.queued_by})")
         return display_queue
@@ -0,0 +1,209 @@
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+from util.voice.cache import MusicCacheManager
+from util.voice.download import MusicDownloader
+
+logger = logging.getLogger(__name__)
+
+class MusicMetadataCache:
+    """
+    TTL-bounded LRU of resolved track metadata (id, title, duration, audio URL).
+    Titles and durations are kept for METADATA_TTL; the audio URL is only reused
+    until its own expiry. Persisted to a small JSON file so repeat plays, queue
+    display and duration checks skip yt-dlp across restarts.
+    """
+    METADATA_FILE = os.path.join(os.path.dirname(__file__), "music_metadata.json")
+    MAX_ENTRIES = 1000
+    METADATA_TTL = 7 * 24 * 60 * 60
+    # Used when the audio URL carries no expire= parameter
+    AUDIO_URL_TTL = 4 * 60 * 60
+    # Don't hand out an audio URL that would expire mid-song
+    AUDIO_URL_MARGIN = 15 * 60
+    # Writes are batched: the file is rewritten at most once per SAVE_DELAY, off the event loop
+    SAVE_DELAY = 5
+
+    VIDEO_ID_RE = re.compile(r"(?:youtu\.be/|/shorts/|/embed/|/live/)([\w-]{11})")
+
+    _entries = OrderedDict()  # video_id: {"id", "title", "duration", "audio_url", "audio_expires", "expires"}, oldest first
+    _inflight = {}  # video_id or url: asyncio.Task, so concurrent resolves of one track share a yt-dlp call
+    _save_task = None  # pending debounced save
+
+    @classmethod
+    def video_id(cls, url):
+        """Best-effort video id from a YouTube URL, without calling yt-dlp."""
+        query_id = parse_qs(urlparse(url).query).get("v")
+        if query_id:
+            return query_id[0]
+        match = cls.VIDEO_ID_RE.search(url)
+        return match.group(1) if match else None
+
+    @classmethod
+    def _audio_expiry(cls, audio_url, now):
+        try:
+            return int(parse_qs(urlparse(audio_url).query)["expire"][0])
+        except (KeyError, ValueError, IndexError):
+            return now + cls.AUDIO_URL_TTL
+
+    @classmethod
+    def get(cls, url):
+        """Return the cached entry for a URL, or None if unknown or expired."""
+        video_id = cls.video_id(url)
+        entry = cls._entries.get(video_id)
+        if not entry:
+            return None
+        if entry["expires"] <= time.time():
+            cls._entries.pop(video_id)
+            return None
+        cls._entries.move_to_end(video_id)
+        return entry
+
+    @classmethod
+    def put(cls, url, info):
+        """Record resolved yt-dlp info for a URL."""
+        video_id = info.get("id") or cls.video_id(url)
+        if not video_id:
+            return
+        now = time.time()
+        audio_url = info.get("audio_url", info.get("url"))
+        entry = {
+            "id": video_id,
+            "title": info.get("title"),
+            "duration": info.get("duration"),
+            "audio_url": audio_url,
+            "audio_expires": cls._audio_expiry(audio_url, now) if audio_url else 0,
+            "acodec": info.get("acodec") if audio_url else None,
+            "abr": info.get("abr") if audio_url else None,
+            "expires": now + cls.METADATA_TTL,
+        }
+        previous = cls._entries.get(video_id)
+        if not audio_url and previous and previous["audio_url"]:
+            # Flat playlist entries carry no audio URL; keep a still-usable one
+            entry["audio_url"] = previous["audio_url"]
+            entry["audio_expires"] = previous["audio_expires"]
+            entry["acodec"] = previous.get("acodec")
+            entry["abr"] = previous.get("abr")
+        cls._entries[video_id] = entry
+        cls._entries.move_to_end(video_id)
+        while len(cls._entries) > cls.MAX_ENTRIES:
+            cls._entries.popitem(last=False)
+        cls.schedule_save()
+
+    @classmethod
+    def _playable_info(cls, url, entry):
+        """
+        Build a playback info dict from a cached entry, or None if it can't be played
+        without yt-dlp. A still-valid stream URL is carried alongside a local file in
+        case the file is evicted before playback.
+        """
+        info = {"id": entry["id"], "title": entry["title"], "duration": entry["duration"], "webpage_url": url}
+        local_file = MusicCacheManager.lookup(entry["id"])
+        if local_file:
+            info["local_file"] = local_file
+        if entry["audio_url"] and entry["audio_expires"] - cls.AUDIO_URL_MARGIN > time.time():
+            info["url"] = entry["audio_url"]
+            info["acodec"] = entry.get("acodec")
+            info["abr"] = entry.get("abr")
+        elif not local_file:
+            return None
+        return info
+
+    @classmethod
+    async def resolve(cls, url, guild_id=None):
+        """Return playback info for a URL, only calling yt-dlp when the cache can't serve it."""
+        entry = cls.get(url)
+        if entry:
+            info = cls._playable_info(url, entry)
+            if info:
+                return info
+        key = cls.video_id(url) or url
+        task = cls._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(MusicDownloader.resolve_stream(url, guild_id=guild_id))
+            cls._inflight[key] = task
+            task.add_done_callback(lambda _: cls._inflight.pop(key, None))
+        # Shielded so one caller giving up doesn't cancel the resolve for the others
+        info = dict(await asyncio.shield(task))
+        cls.put(url, info)
+        return info
+
+    @classmethod
+    def add_flat_entries(cls, entries):
+        """Seed the cache from flat playlist entries and return their watch URLs."""
+        urls = []
+        for entry in entries:
+            url = entry.get("webpage_url") or entry["url"]
+            if not cls.get(url):
+                # Flat entries have no stream URL; "url" here is the watch page
+                cls.put(url, {"id": entry.get("id"), "title": entry.get("title"),
+                              "duration": entry.get("duration"), "audio_url": None})
+            urls.append(url)
+        return urls
+
+    @classmethod
+    async def warm(cls, urls, guild_id=None):
+        """Resolve metadata for several URLs concurrently; the downloader's per-guild cap bounds the fan-out."""
+        results = await asyncio.gather(
+            *(cls.resolve(url, guild_id=guild_id) for url in urls if not cls.get(url)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to resolve track metadata: {result}")
+
+    @classmethod
+    def schedule_save(cls):
+        """Save once after SAVE_DELAY, however many entries change in between; saves now outside a running loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            cls.save()
+            return
+        if cls._save_task is None or cls._save_task.done():
+            cls._save_task = loop.create_task(cls._delayed_save())
+
+    @classmethod
+    async def _delayed_save(cls):
+        await asyncio.sleep(cls.SAVE_DELAY)
+        await cls.flush()
+
+    @classmethod
+    async def flush(cls):
+        """Write the cache now, in a thread. Entries are snapshotted on the loop so the thread never sees them change."""
+        if cls._save_task and not cls._save_task.done() and cls._save_task is not asyncio.current_task():
+            cls._save_task.cancel()
+        await asyncio.to_thread(cls.save, list(cls._entries.values()))
+
+    @classmethod
+    def save(cls, entries=None):
+        if entries is None:
+            entries = list(cls._entries.values())
+        tmp_file = cls.METADATA_FILE + ".tmp"
+        try:
+            with open(tmp_file, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_file, cls.METADATA_FILE)
+        except Exception as e:
+            logger.warning(f"Failed to save music metadata cache: {e}")
+
+    @classmethod
+    def load(cls):
+        """Load the persisted entries at startup, dropping expired ones."""
+        entries = []
+        if os.path.exists(cls.METADATA_FILE):
+            try:
+                with open(cls.METADATA_FILE, "r") as f:
+                    entries = json.load(f)
+            except Exception as e:
+                logger.warning(f"Failed to read music metadata cache, starting empty: {e}")
+
+        now = time.time()
+        cls._entries = OrderedDict(
+            (entry["id"], entry) for entry in entries[-cls.MAX_ENTRIES:] if entry.get("expires", 0) > now
+        )
+        return f"✅ Music metadata loaded. Entries: {len(cls._entries)}"
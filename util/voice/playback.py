@@ -1,10 +1,44 @@
+import os
 import discord
 import datetime
 
 class MusicPlayback:
+    # Let FFmpeg ride out dropped connections on long remote streams
+    FFMPEG_BEFORE_OPTIONS = "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5"
+    FFMPEG_OPTIONS = "-vn"
+
+    @staticmethod
+    async def build_source(info):
+        """
+        Play the prefetched file if there is one, otherwise stream the resolved audio URL.
+        Opus sources are passed through with codec copy instead of being decoded to PCM
+        and re-encoded by discord.py. When yt-dlp already reported the codec the probe is
+        skipped; otherwise FFmpeg picks copy or libopus from the probe.
+        A start_offset (seconds) seeks into the track, for resuming after a restart.
+        """
+        seek = f"-ss {info['start_offset']:.1f}" if info.get('start_offset') else None
+        filename = info.get('local_file')
+        if filename and os.path.exists(filename):
+            return await discord.FFmpegOpusAudio.from_probe(
+                filename, before_options=seek, options=MusicPlayback.FFMPEG_OPTIONS)
+
+        if not info.get('url'):
+            raise ValueError(f"No playable source for {info.get('title', 'this track')}: cached file is gone and no stream URL")
+        before_options = f"{MusicPlayback.FFMPEG_BEFORE_OPTIONS} {seek}" if seek else MusicPlayback.FFMPEG_BEFORE_OPTIONS
+        if info.get('acodec') not in (None, 'none'):
+            return discord.FFmpegOpusAudio(
+                info['url'],
+                codec=info['acodec'],
+                bitrate=min(int(info.get('abr') or 128), 512),
+                before_options=before_options,
+                options=MusicPlayback.FFMPEG_OPTIONS
+            )
+        return await discord.FFmpegOpusAudio.from_probe(
+            info['url'],
+            before_options=before_options,
+            options=MusicPlayback.FFMPEG_OPTIONS
+        )
+
     @staticmethod
-    async def play_audio(vc, info, filename, ctx):
-        vc.play(discord.FFmpegPCMAudio(source=filename))
-        duration = info.get('duration')
-        duration_str = f"{int(duration//60)}:{int(duration%60):02d}" if duration else "Unknown"
-        await ctx.send(f"Now playing: {info.get('title', 'Unknown Title')} ({duration_str}) (queued by {info.get('queued_by', 'Unknown')})")
\ No newline at end of file
+    async def play_error(ctx, error):
+        await ctx.send(f"Error playing track: {error}")
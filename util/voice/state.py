@@ -1,9 +1,79 @@
+import time
 import asyncio
+from util.voice.metadata import MusicMetadataCache
+
+
+class Track:
+    def __init__(self, url, queued_by, info=None, requester=None, start_offset=0):
+        self.url = url
+        self.queued_by = queued_by
+        self.requester = requester  # discord.Member, for duration checks
+        self.start_offset = start_offset  # seconds; set when a track resumes after a restart
+        self.rejected = None  # duration check message, set by the prefetcher when the track may not play
+        self.info = info  # resolved yt-dlp metadata, filled in by the prefetcher
+        self.prefetch_task = None  # resolves info; playback waits on this only
+        self.download_task = None  # caches the file in the background for later plays
+
+    @property
+    def title(self):
+        if self.info:
+            return self.info.get('title', 'Unknown Title')
+        entry = MusicMetadataCache.get(self.url)
+        return entry["title"] if entry and entry["title"] else "Fetching..."
+
+    def cancel_prefetch(self):
+        for task in (self.prefetch_task, self.download_task):
+            if task and not task.done():
+                task.cancel()
+        self.prefetch_task = None
+        self.download_task = None
 
 
 class GuildMusicState:
-    def __init__(self):
-        self.queue = []
+    def __init__(self, guild_id=None):
+        self.guild_id = guild_id
+        self.queue = []  # [Track]
         self.now_playing = None
+        self.now_playing_start = None
+        self.current = None  # Track behind now_playing
         self.voice_client = None
+        self.text_channel = None
+        self.skip_votes = set()
         self.lock = asyncio.Lock()
+        self.wakeup = asyncio.Event()
+        self.worker = None
+        self.last_active = time.monotonic()
+        self.empty_since = None  # when the voice channel was first seen without listeners
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    @property
+    def queue_offset(self):
+        """Displayed number of queue[0]; the playing track is shown as 1."""
+        return 2 if self.now_playing else 1
+
+    def is_idle(self):
+        """Nothing playing and nothing waiting to play."""
+        return not self.now_playing and not self.queue
+
+    def enqueue(self, track):
+        self.queue.append(track)
+        self.touch()
+        self.wakeup.set()
+
+    def enqueue_many(self, tracks):
+        self.queue.extend(tracks)
+        self.touch()
+        self.wakeup.set()
+
+    def remove(self, index):
+        """Remove and return the track at index, cancelling its prefetch."""
+        track = self.queue.pop(index)
+        track.cancel_prefetch()
+        return track
+
+    def clear(self):
+        for track in self.queue:
+            track.cancel_prefetch()
+        self.queue.clear()
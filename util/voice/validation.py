@@ -1,5 +1,7 @@
 
 import re
+import discord
+from urllib.parse import urlparse, parse_qs
 
 class MusicValidation:
     YOUTUBE_URL_RE = re.compile(r"^(https?\:\/\/)?(www\.|m\.)?(youtube\.com|youtu\.be)\/.+$")
@@ -9,19 +11,25 @@ class MusicValidation:
         return bool(MusicValidation.YOUTUBE_URL_RE.match(url))
 
     @staticmethod
-    def check_duration_permissions(ctx, duration):
+    def is_playlist_url(url: str) -> bool:
+        """A /playlist?list=... link; watch links that carry a list= still play a single video."""
+        parsed = urlparse(url if "://" in url else f"https://{url}")
+        return parsed.path.rstrip("/") == "/playlist" and "list" in parse_qs(parsed.query)
+
+    @staticmethod
+    def check_duration_permissions(member, duration):
         """
-        Check if user has permission to play a song of given duration.
+        Check if a member has permission to play a song of given duration.
         Returns (allowed: bool, message: str)
         """
         if duration is None:
             return False, "Could not determine the length of this song/video."
         
-        perms = ctx.author.guild_permissions
+        perms = member.guild_permissions
         is_mod = perms.manage_guild or perms.manage_messages
-        is_server_owner = ctx.author.id == ctx.guild.owner_id
-        premium_role = discord.utils.get(ctx.guild.roles, name="Premium Members")
-        has_premium = premium_role in ctx.author.roles if premium_role else False
+        is_server_owner = member.id == member.guild.owner_id
+        premium_role = discord.utils.get(member.guild.roles, name="Premium Members")
+        has_premium = premium_role in member.roles if premium_role else False
 
         if is_server_owner:
             return True, ""
@@ -32,4 +40,4 @@ class MusicValidation:
             if duration > 5 * 60:  # 5 minutes
                 return False, "Song length is capped at 5 minutes. Premium members can play songs up to 1 hour long."
         
-        return True,
\ No newline at end of file
+        return True, ""
\ No newline at end of file
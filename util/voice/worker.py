@@ -0,0 +1,163 @@
+import asyncio
+import datetime
+import logging
+from util.voice.cache import MusicCacheManager
+from util.voice.download import MusicDownloader
+from util.voice.metadata import MusicMetadataCache
+from util.voice.playback import MusicPlayback
+from util.voice.validation import MusicValidation
+
+logger = logging.getLogger(__name__)
+
+class MusicQueueWorker:
+    """
+    Plays a guild's queue in order and resolves upcoming tracks in the background.
+    Playback only waits for the resolve and streams the audio URL; the download
+    into the shared music cache runs alongside and only serves later plays.
+    """
+    PREFETCH_AHEAD = 2
+    # Download upcoming tracks into the shared music cache as well as streaming them
+    PREFETCH_TO_DISK = True
+
+    _download_locks = {}  # video_id: asyncio.Lock, shared across guilds
+
+    def __init__(self, bot, state):
+        self.bot = bot
+        self.state = state
+        self._task = None
+
+    def start(self):
+        if not self._task or self._task.done():
+            self._task = self.bot.loop.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self.state.clear()
+
+    def schedule_prefetch(self):
+        """Start resolving the next PREFETCH_AHEAD tracks if they are not already in flight."""
+        for track in self.state.queue[:self.PREFETCH_AHEAD]:
+            if track.prefetch_task is None:
+                track.prefetch_task = self.bot.loop.create_task(self._prefetch(track))
+
+    async def _prefetch(self, track):
+        """Resolve the track and check its duration, then start caching it to disk without waiting for that."""
+        if not track.info:
+            track.info = await MusicMetadataCache.resolve(track.url, guild_id=self.state.guild_id)
+            track.info['queued_by'] = track.queued_by
+
+        # Over-length tracks are rejected here, before anything is downloaded
+        if track.requester:
+            allowed, message = MusicValidation.check_duration_permissions(track.requester, track.info.get('duration'))
+            if not allowed:
+                track.rejected = message
+                return
+
+        if self.PREFETCH_TO_DISK and track.download_task is None and not MusicCacheManager.lookup(track.info.get('id')):
+            track.download_task = self.bot.loop.create_task(self._download(track))
+
+    async def _download(self, track):
+        video_id = track.info.get('id')
+        lock = self._download_locks.setdefault(video_id, asyncio.Lock())
+        try:
+            async with lock:
+                if not MusicCacheManager.lookup(video_id):
+                    _, cached = await MusicDownloader.download_youtube(
+                        track.url, MusicCacheManager.outtmpl(), guild_id=self.state.guild_id)
+                    MusicCacheManager.register(video_id, cached)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Playback streams the resolved URL, so a failed download only loses the cache hit
+            logger.warning(f"Prefetch download failed for {track.url}: {e}")
+        finally:
+            if not lock.locked():
+                self._download_locks.pop(video_id, None)
+
+    async def _run(self):
+        state = self.state
+        while True:
+            if not state.queue:
+                state.wakeup.clear()
+                await state.wakeup.wait()
+                continue
+
+            track = state.queue.pop(0)
+            if track.prefetch_task is None:
+                track.prefetch_task = self.bot.loop.create_task(self._prefetch(track))
+            self.schedule_prefetch()
+
+            try:
+                await track.prefetch_task
+            except asyncio.TimeoutError:
+                await self._send(f"Timed out resolving {track.url}, skipping it.")
+                continue
+            except Exception as e:
+                await self._send(f"Error resolving {track.url}: {e}")
+                continue
+
+            if track.rejected:
+                await self._send(f"Skipping {track.title}: {track.rejected}")
+                continue
+
+            try:
+                await self._play(track)
+            except Exception as e:
+                logger.error(f"Playback failed for {track.url}: {e}", exc_info=True)
+                await self._send(f"Error playing {track.title}: {e}")
+
+    async def _play(self, track):
+        state = self.state
+        vc = state.voice_client
+        if not vc or not vc.is_connected():
+            return
+
+        info = track.info
+        # Use the cached file if it is still there (a repeat, or a download that beat us); otherwise stream
+        cached = MusicCacheManager.lookup(info.get('id'))
+        if cached:
+            info = {**info, 'local_file': cached}
+        else:
+            info = {key: value for key, value in info.items() if key != 'local_file'}
+            if not info.get('url'):
+                # Resolved to a cached file that has since been evicted; fetch a stream URL
+                info = await MusicMetadataCache.resolve(track.url, guild_id=state.guild_id)
+                info['queued_by'] = track.queued_by
+        if track.start_offset:
+            info = {**info, 'start_offset': track.start_offset}
+        local_file = info.get('local_file')
+        finished = asyncio.Event()
+        loop = self.bot.loop
+
+        def after_playing(error):
+            if error:
+                logger.warning(f"Player error: {error}")
+            loop.call_soon_threadsafe(finished.set)
+
+        if local_file:
+            MusicCacheManager.acquire(local_file)
+        try:
+            vc.play(await MusicPlayback.build_source(info), after=after_playing)
+            state.now_playing = info
+            state.current = track
+            state.now_playing_start = datetime.datetime.now()
+            state.touch()
+            state.skip_votes.clear()
+            await self._send(f"Now playing: {track.title} (queued by {track.queued_by})")
+            await finished.wait()
+        finally:
+            state.now_playing = None
+            state.current = None
+            state.now_playing_start = None
+            state.touch()
+            if local_file:
+                MusicCacheManager.release(local_file)
+
+    async def _send(self, message):
+        if self.state.text_channel:
+            try:
+                await self.state.text_channel.send(message)
+            except Exception as e:
+                logger.warning(f"Failed to send music message: {e}")